@@ -8,10 +8,12 @@ import sys
 import os
 
 from claude_pr_reviewer.interfaces import GitInterface, AIReviewerInterface, UserInterfaceInterface
-from claude_pr_reviewer.git import GitCLI
-from claude_pr_reviewer.ai import ClaudeAIReviewer
-from claude_pr_reviewer.ui import PyQtUI, TerminalUI, GUI_TOOLKIT
+from claude_pr_reviewer.git import GitCLI, Pygit2Git, PYGIT2_AVAILABLE
+from claude_pr_reviewer.ai import ClaudeAIReviewer, DaemonAIReviewer
+from claude_pr_reviewer.ai.claude_ai_reviewer import DEFAULT_MODEL
+from claude_pr_reviewer.ui import TerminalUI, GUI_TOOLKIT, gui_available
 from claude_pr_reviewer.config_manager import ConfigManager
+from claude_pr_reviewer.review_cache import ReviewCache, DEFAULT_CACHE_TTL
 from claude_pr_reviewer.pr_reviewer import PRReviewer
 
 
@@ -26,16 +28,50 @@ def main() -> int:
             print("Claude API key not configured. Please set CLAUDE_API_KEY environment variable.")
             return 1
         
-        # Initialize components
-        git_interface = GitCLI()
-        ai_reviewer = ClaudeAIReviewer(api_key)
-        
         # Choose UI based on availability
-        if GUI_TOOLKIT == "PyQt5":
+        if gui_available():
+            from claude_pr_reviewer.ui import PyQtUI
             ui = PyQtUI()
         else:
             ui = TerminalUI()
-            print("Using terminal-based UI as PyQt5 is not available.")
+            if GUI_TOOLKIT == "PyQt5":
+                print("Using terminal-based UI as no display is available.")
+            else:
+                print("Using terminal-based UI as PyQt5 is not available.")
+        
+        # Initialize components
+        # Read the repository in-process when pygit2 is installed
+        git_interface = Pygit2Git() if PYGIT2_AVAILABLE else GitCLI()
+        # The environment can override the configured prompt diff size for one run;
+        # like max_diff_size, it counts characters of the diff, not bytes
+        max_diff_size = config_manager.get("max_diff_size") or 10000
+        env_max_diff = os.environ.get("CLAUDE_PR_MAX_DIFF_CHARS")
+        if env_max_diff:
+            try:
+                max_diff_size = int(env_max_diff)
+            except ValueError:
+                print(f"Ignoring CLAUDE_PR_MAX_DIFF_CHARS={env_max_diff!r}, which is not a whole number.")
+        model = config_manager.get("model") or DEFAULT_MODEL
+        # Re-pushing the same change reuses its review unless caching is turned off
+        cache_ttl = config_manager.get("review_cache_ttl")
+        cache_ttl = DEFAULT_CACHE_TTL if cache_ttl is None else int(cache_ttl)
+        if config_manager.get("use_daemon"):
+            # Review through a long-lived process that keeps its connection warm
+            ai_reviewer = DaemonAIReviewer(
+                api_key,
+                on_text=ui.show_progress,
+                max_diff_size=max_diff_size,
+                model=model,
+                cache_ttl=cache_ttl
+            )
+        else:
+            ai_reviewer = ClaudeAIReviewer(
+                api_key,
+                on_text=ui.show_progress,
+                cache=None if cache_ttl == 0 else ReviewCache(ttl=cache_ttl),
+                max_diff_size=max_diff_size,
+                model=model
+            )
         
         # Run the reviewer
         reviewer = PRReviewer(git_interface, ai_reviewer, ui)
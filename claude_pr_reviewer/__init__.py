@@ -4,14 +4,27 @@ and displays comments in a GUI before allowing a push.
 """
 
 from claude_pr_reviewer.interfaces import GitInterface, AIReviewerInterface, UserInterfaceInterface
-from claude_pr_reviewer.git import GitCLI
-from claude_pr_reviewer.ai import ClaudeAIReviewer, DiffSyntaxHighlighter
-from claude_pr_reviewer.ui import PyQtUI, TerminalUI
+from claude_pr_reviewer.git import GitCLI, Pygit2Git
+from claude_pr_reviewer.ai import ClaudeAIReviewer, DaemonAIReviewer, ReviewDaemon
+from claude_pr_reviewer.ui import TerminalUI
 from .config_manager import ConfigManager 
 from .pr_reviewer import PRReviewer
+from .review_cache import ReviewCache
+
+
+def __getattr__(name):
+    """Import the PyQt5-based classes only when they are asked for"""
+    if name == "PyQtUI":
+        from claude_pr_reviewer.ui import PyQtUI
+        return PyQtUI
+    if name == "DiffSyntaxHighlighter":
+        from claude_pr_reviewer.ai import DiffSyntaxHighlighter
+        return DiffSyntaxHighlighter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'GitInterface', 'AIReviewerInterface', 'UserInterfaceInterface',
-    'GitCLI', 'ClaudeAIReviewer', 'DiffSyntaxHighlighter',
-    'PyQtUI', 'TerminalUI', 'ConfigManager', 'PRReviewer'
+    'GitCLI', 'Pygit2Git', 'ClaudeAIReviewer', 'DaemonAIReviewer', 'ReviewDaemon', 'DiffSyntaxHighlighter',
+    'PyQtUI', 'TerminalUI', 'ConfigManager', 'PRReviewer', 'ReviewCache'
 ]
\ No newline at end of file
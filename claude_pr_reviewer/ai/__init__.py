@@ -3,6 +3,16 @@ AI reviewer implementation classes.
 """
 
 from .claude_ai_reviewer import ClaudeAIReviewer
-from .diff_syntax_highlighter import DiffSyntaxHighlighter
+from .daemon_ai_reviewer import DaemonAIReviewer, ReviewDaemon
 
-__all__ = ['ClaudeAIReviewer', 'DiffSyntaxHighlighter']
\ No newline at end of file
+
+def __getattr__(name):
+    """Import the Qt syntax highlighter the first time it is asked for"""
+    if name == "DiffSyntaxHighlighter":
+        from .diff_syntax_highlighter import DiffSyntaxHighlighter
+        globals()["DiffSyntaxHighlighter"] = DiffSyntaxHighlighter
+        return DiffSyntaxHighlighter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['ClaudeAIReviewer', 'DaemonAIReviewer', 'ReviewDaemon', 'DiffSyntaxHighlighter']
\ No newline at end of file
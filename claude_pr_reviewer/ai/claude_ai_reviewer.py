@@ -2,54 +2,248 @@
 Claude AI reviewer implementation using the Claude API.
 """
 
-import requests
-from typing import List, Dict, Any
+import re
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Optional
+from claude_pr_reviewer import json_utils
 from claude_pr_reviewer.interfaces import AIReviewerInterface
+from claude_pr_reviewer.review_cache import ReviewCache
 
+if TYPE_CHECKING:
+    import requests
+
+
+# A section header (e.g. "Issues:", "## Suggestions", "- Potential bugs:")
+# followed by the bullet items that belong to it
+_SECTION_RE = re.compile(
+    r"^[#* \t-]*(?:[a-z]+[ \t]+){0,2}"
+    r"(?P<header>issue|problem|bug|suggestion|improvement)s?\b[^\n]*\n"
+    r"(?P<items>(?:[ \t]*\n)*(?:[ \t]*(?:[-*]|\d+[.)])[ \t]+[^\n]*(?:\n|$))+)",
+    re.IGNORECASE | re.MULTILINE
+)
+_BULLET_RE = re.compile(r"^[ \t]*(?:[-*]|\d+[.)])[ \t]+(.+)$", re.MULTILINE)
+_SECTION_NAMES = {
+    "issue": "issues",
+    "problem": "issues",
+    "bug": "issues",
+    "suggestion": "suggestions",
+    "improvement": "suggestions",
+}
+
+DEFAULT_MODEL = "claude-3-haiku-20240307"
+
+# Smallest token estimate for a diff, and the largest max_tokens for its review
+MIN_REVIEW_TOKENS = 256
+MAX_REVIEW_TOKENS = 4096
+
+# Longest single wait before a retry, and the most time spent waiting across all retries,
+# so a rate limit with a long Retry-After can't hold up the push for minutes
+MAX_RETRY_SLEEP = 8
+MAX_RETRY_WAIT = 20
+
+# The start of each file's section and of each hunk in a diff
+_FILE_RE = re.compile(r"^diff --git ", re.MULTILINE)
+_FILE_HEADER_RE = re.compile(r"^diff --git [^\n]*", re.MULTILINE)
+_HUNK_RE = re.compile(r"^@@ ", re.MULTILINE)
+
+# Hunks of a single file sent for review once the diff is over the size limit
+MAX_HUNKS_PER_FILE = 8
+
+
+def _file_name(file_diff: str) -> str:
+    """Get the path from the "diff --git a/... b/..." header of one file's diff"""
+    header = file_diff.split("\n", 1)[0]
+    return header.rsplit(" b/", 1)[-1] if " b/" in header else header
+
+
+# A reference to a line or range of lines, e.g. "line 42" or "lines 10-14"
+_LINE_REF_RE = re.compile(r"\blines?\s+(\d+)(?:\s*(?:-|to)\s*(\d+))?", re.IGNORECASE)
+
+# Longest range of lines a single reference is expanded to
+MAX_LINE_REF_SPAN = 50
+
+
+def _names_file(comment: str, path: str) -> bool:
+    """Check whether a comment mentions a file by its path or, as reviews often do, just its name"""
+    for name in (path, path.rsplit("/", 1)[-1]):
+        if re.search(r"(?<![\w./-])" + re.escape(name) + r"(?![\w/])", comment):
+            return True
+    return False
+
+# Marks an issue as one that should block the push
+_CRITICAL_RE = re.compile(r"critical", re.IGNORECASE)
+
+# Lines that look like issues or suggestions when the review has no bullet lists
+_FALLBACK_RES = {
+    "issues": re.compile(r"^.*(?:issue|bug|error|fix).*$", re.IGNORECASE | re.MULTILINE),
+    "suggestions": re.compile(r"^.*(?:suggest|could|would be better).*$", re.IGNORECASE | re.MULTILINE),
+}
+
+
+# Review instructions, sent as a cacheable system prompt so that only the
+# commit details and diff in the user message change between requests
+_SYSTEM_PROMPT = """You review git diffs before they are pushed.
+
+Focus on:
+1. Potential bugs or issues
+2. Security concerns
+3. Code quality and maintainability
+4. Suggestions for improvement
+
+Format your response with these sections:
+- Summary: Brief overview of the changes
+- Issues: List any problems that should be fixed (prioritized)
+- Suggestions: Optional improvements that would be nice to have
+- Questions: Anything that needs clarification
+
+Please be concise and focus on the most important points. If you find critical issues that should block the commit, start your response with "CRITICAL ISSUES FOUND"."""
 
 class ClaudeAIReviewer(AIReviewerInterface):
     """Concrete implementation of AIReviewerInterface using Claude API"""
     
-    def __init__(self, api_key: str):
-        """Initialize with Claude API key"""
+    def __init__(
+        self,
+        api_key: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        cache: Optional[ReviewCache] = None,
+        max_diff_size: int = 10000,
+        model: str = DEFAULT_MODEL
+    ):
+        """Initialize with Claude API key, an optional callback for streamed text, a review cache and the model"""
         self.api_key = api_key
+        self.max_diff_size = max_diff_size
+        self.model = model
+        self.on_text = on_text
+        self.cache = cache
         self.api_url = "https://api.anthropic.com/v1/messages"
         self.headers = {
             "Content-Type": "application/json",
             "x-api-key": api_key,
             "anthropic-version": "2023-06-01"
         }
+        self.session: Optional["requests.Session"] = None
+    
+    def _get_session(self) -> "requests.Session":
+        """Create the HTTP session on first use so runs without a review never import requests"""
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.exceptions import MaxRetryError, ResponseError
+            from urllib3.util.retry import Retry
+            
+            class CountingRetry(Retry):
+                """Retry that caps the total time spent waiting and notes on the final error how many retries were made"""
+                
+                # When to stop retrying, set at the first failure and carried over to each new Retry
+                deadline: Optional[float] = None
+                
+                def new(self, **kwargs):
+                    retry = super().new(**kwargs)
+                    retry.deadline = self.deadline
+                    return retry
+                
+                def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+                    try:
+                        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+                        if retry.deadline is None:
+                            retry.deadline = time.monotonic() + MAX_RETRY_WAIT
+                        elif time.monotonic() >= retry.deadline:
+                            reason = error or ResponseError(f"gave up retrying after {MAX_RETRY_WAIT} seconds")
+                            raise MaxRetryError(_pool, url, reason)
+                        return retry
+                    except MaxRetryError as e:
+                        # Connection errors come back without a response to read this from
+                        e.retries = len(self.history)
+                        raise
+                
+                def _remaining(self) -> float:
+                    """Get how much of the waiting budget is left"""
+                    if self.deadline is None:
+                        return MAX_RETRY_WAIT
+                    return max(0.0, self.deadline - time.monotonic())
+                
+                def get_retry_after(self, response):
+                    retry_after = super().get_retry_after(response)
+                    if retry_after is None:
+                        return None
+                    return min(retry_after, MAX_RETRY_SLEEP, self._remaining())
+                
+                def get_backoff_time(self):
+                    return min(super().get_backoff_time(), MAX_RETRY_SLEEP, self._remaining())
+            
+            # Reuse one connection (and TLS session) for the request and any retries
+            self.session = requests.Session()
+            self.session.headers.update(self.headers)
+            # Back off exponentially on rate limits and overload (honouring
+            # Retry-After) rather than failing the push on a transient error
+            retry_options = {
+                "total": 4,
+                "backoff_factor": 0.7,
+                "status_forcelist": [429, 500, 502, 503, 504, 529],
+                "allowed_methods": frozenset({"POST"}),
+                "respect_retry_after_header": True,
+                "raise_on_status": False,
+            }
+            try:
+                retry = CountingRetry(backoff_jitter=0.5, backoff_max=MAX_RETRY_SLEEP, **retry_options)
+            except TypeError:
+                # urllib3 < 2 has no jitter or backoff_max; get_backoff_time still caps each wait
+                retry = CountingRetry(**retry_options)
+            self.session.mount("https://", HTTPAdapter(max_retries=retry))
+        return self.session
     
     def review_code(self, diff: str, commit_msg: str, branch: str) -> Dict[str, Any]:
         """Review the code using Claude AI and return the results"""
         # Check if there's anything to review
-        if not diff.strip():
+        if not diff or diff.isspace():
             return {
                 "review_text": "No changes to review.",
                 "suggestions": [],
                 "issues": [],
+                "has_critical": False,
                 "raw_response": {},
                 "diff": ""
             }
             
-        prompt = self._create_prompt(diff, commit_msg, branch)
+        # Only send up to max_diff_size characters of the diff to Claude
+        prompt_diff = self._truncate_diff(diff)
+        prompt = self._create_prompt(prompt_diff, commit_msg, branch)
         
         payload = {
-            "model": "claude-3-haiku-20240307",
-            "max_tokens": 1000,
+            "model": self.model,
+            "max_tokens": self._max_tokens(diff),
+            "system": [
+                {"type": "text", "text": _SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+            ],
             "messages": [
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            "stream": True
         }
         
+        # Reuse an earlier review of exactly the same change if we have one; the
+        # full diff is part of the key too, since different diffs can truncate
+        # to the same prompt and the cached review carries the diff it was for
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(
+                self.api_url, payload["model"], _SYSTEM_PROMPT, branch, commit_msg, prompt_diff, diff
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        import requests
+        
         try:
-            response = requests.post(
+            response = self._get_session().post(
                 self.api_url,
-                headers=self.headers,
-                json=payload
+                data=json_utils.dumps(payload),
+                stream=True,
+                timeout=(5, 60)
             )
             response.raise_for_status()
-            result = response.json()
+            result = self._read_stream(response)
             
             # Ensure we have valid content to work with
             review_text = ""
@@ -58,111 +252,195 @@ class ClaudeAIReviewer(AIReviewerInterface):
             else:
                 review_text = "Could not extract review text from API response."
                 
-            return {
+            sections = self._parse_sections(review_text)
+            review_data = {
                 "review_text": review_text,
-                "suggestions": self._extract_suggestions(review_text),
-                "issues": self._extract_issues(review_text),
+                "suggestions": sections["suggestions"],
+                "issues": sections["issues"],
+                "has_critical": any(_CRITICAL_RE.search(issue) for issue in sections["issues"]),
+                "by_line": self._index_line_refs(sections["issues"] + sections["suggestions"], diff),
                 "raw_response": result,
                 "diff": diff  # Include the diff for side-by-side view
             }
-        except requests.RequestException as e:
+            if cache_key:
+                self.cache.set(cache_key, review_data)
+            return review_data
+        except (requests.RequestException, ValueError) as e:
+            # ValueError covers a malformed line in the event stream
+            retries = self._retry_count(e)
+            after = f" (after {retries} retries)" if retries is not None else ""
             return {
                 "error": str(e),
-                "review_text": f"Error calling Claude API: {e}",
+                "retries": retries,
+                "review_text": f"Error calling Claude API{after}: {e}",
                 "suggestions": [],
                 "issues": [],
+                "has_critical": False,
                 "diff": diff,  # Include the diff even on error
                 "raw_response": {}
             }
     
-    def _create_prompt(self, diff: str, commit_msg: str, branch: str) -> str:
-        """Create the prompt for Claude"""
-        return f"""Please review the following git diff for a commit on branch "{branch}" with commit message: "{commit_msg}".
-
-Focus on:
-1. Potential bugs or issues
-2. Security concerns
-3. Code quality and maintainability
-4. Suggestions for improvement
-
-Format your response with these sections:
-- Summary: Brief overview of the changes
-- Issues: List any problems that should be fixed (prioritized)
-- Suggestions: Optional improvements that would be nice to have
-- Questions: Anything that needs clarification
-
-Here's the diff:
-```
-{diff}
-```
-
-Please be concise and focus on the most important points. If you find critical issues that should block the commit, start your response with "CRITICAL ISSUES FOUND".
-"""
+    def _retry_count(self, error: Exception) -> Optional[int]:
+        """Get how many times the request was retried before it finally failed, or None if unknown"""
+        # Errors with a response carry the retry state that produced it
+        response = getattr(error, "response", None)
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        if retries is not None:
+            return len(retries.history)
+        
+        # Connection errors wrap the MaxRetryError that CountingRetry counted on
+        for arg in error.args:
+            count = getattr(arg, "retries", None)
+            if isinstance(count, int):
+                return count
+        return None
     
-    def _extract_suggestions(self, review_text: str) -> List[str]:
-        """Extract suggestions from the review text"""
-        if not review_text:
-            return []
-            
-        suggestions = []
-        in_suggestions_section = False
+    def _read_stream(self, response: "requests.Response") -> Dict[str, Any]:
+        """Assemble a streamed (SSE) Messages API response into a single message"""
+        import requests
         
-        try:
-            for line in review_text.split('\n'):
-                # Check for section headers in various formats
-                if 'suggestion' in line.lower() or 'improvement' in line.lower():
-                    in_suggestions_section = True
+        message: Dict[str, Any] = {}
+        text_parts = []
+        
+        with response:
+            for line in response.iter_lines():
+                # Only the data lines carry payloads; event names are repeated inside them
+                if not line.startswith(b"data:"):
                     continue
-                elif in_suggestions_section and (line.startswith('- ') or line.startswith('* ')):
-                    suggestions.append(line[2:].strip())
-                elif in_suggestions_section and (line.startswith('#') or line == '' or 
-                                               'issue' in line.lower() or 
-                                               'question' in line.lower() or
-                                               'summary' in line.lower()):
-                    in_suggestions_section = False
-            
-            # If we didn't find any formatted suggestions, look for any lines with suggestion-like content
-            if not suggestions:
-                for line in review_text.split('\n'):
-                    if ('suggest' in line.lower() or 'could' in line.lower() or 'would be better' in line.lower()) and len(line) > 10:
-                        suggestions.append(line.strip())
-                        
-            return suggestions[:10]  # Limit to 10 suggestions
-        except Exception:
-            return []
+                event = json_utils.loads(line[5:])
+                event_type = event.get("type")
+                
+                if event_type == "message_start":
+                    message = event.get("message", {})
+                elif event_type == "content_block_delta":
+                    text = event.get("delta", {}).get("text", "")
+                    if text:
+                        text_parts.append(text)
+                        if self.on_text:
+                            self.on_text(text)
+                elif event_type == "message_delta":
+                    message.update(event.get("delta", {}))
+                    message.setdefault("usage", {}).update(event.get("usage", {}))
+                elif event_type == "error":
+                    error = event.get("error", {})
+                    raise requests.RequestException(error.get("message", "Error in streamed response"))
+        
+        message["content"] = [{"type": "text", "text": "".join(text_parts)}] if text_parts else []
+        return message
     
-    def _extract_issues(self, review_text: str) -> List[str]:
-        """Extract issues from the review text"""
+    def _max_tokens(self, diff: str) -> int:
+        """Size the response budget to the whole change, not just the part that fits in the prompt"""
+        # Estimate the diff at about one token per dozen bytes and allow half that for the review
+        est_tokens = max(MIN_REVIEW_TOKENS, len(diff.encode("utf-8", errors="replace")) // 12)
+        return min(MAX_REVIEW_TOKENS, est_tokens // 2)
+    
+    def _truncate_diff(self, diff: str) -> str:
+        """Fit the diff into max_diff_size characters, trimming the largest files first"""
+        if len(diff) <= self.max_diff_size:
+            return diff
+        
+        # Split into one section per file, keeping only the first few hunks of each
+        starts = [match.start() for match in _FILE_RE.finditer(diff)] or [0]
+        files = [self._limit_hunks(diff[start:end]) for start, end in zip(starts, starts[1:] + [len(diff)])]
+        files[0] = diff[:starts[0]] + files[0]
+        
+        # Leave out the largest files until the rest fits, but always keep one
+        total = sum(len(file_diff) for file_diff in files)
+        omitted = set()
+        for i in sorted(range(len(files)), key=lambda i: len(files[i]), reverse=True):
+            if total <= self.max_diff_size or len(omitted) == len(files) - 1:
+                break
+            omitted.add(i)
+            total -= len(files[i])
+        
+        body = "".join(file_diff for i, file_diff in enumerate(files) if i not in omitted)
+        note = ""
+        if omitted:
+            names = ", ".join(_file_name(files[i]) for i in sorted(omitted))
+            note = f"...[{len(omitted)} large files omitted: {names}]..."
+        
+        # A single file can still be too big on its own
+        if len(body) > self.max_diff_size:
+            cut = body.rfind("\n", 0, self.max_diff_size)
+            if cut <= 0:
+                cut = self.max_diff_size
+            body = f"{body[:cut]}\n...[diff truncated, {len(body) - cut} more characters]..."
+        if note:
+            body = body.rstrip("\n") + "\n" + note
+        return body
+    
+    def _limit_hunks(self, file_diff: str) -> str:
+        """Keep only the first MAX_HUNKS_PER_FILE hunks of one file's diff"""
+        hunks = [match.start() for match in _HUNK_RE.finditer(file_diff)]
+        if len(hunks) <= MAX_HUNKS_PER_FILE:
+            return file_diff
+        cut = hunks[MAX_HUNKS_PER_FILE]
+        remaining = file_diff.count("\n", cut)
+        return f"{file_diff[:cut]}...[{remaining} more lines in this file truncated]...\n"
+    
+    def _create_prompt(self, diff: str, commit_msg: str, branch: str) -> str:
+        """Create the user message for Claude; the instructions are in the system prompt"""
+        return "".join((
+            'Please review the following git diff for a commit on branch "',
+            branch,
+            '" with commit message: "',
+            commit_msg,
+            '".\n\nHere\'s the diff:\n```\n',
+            diff,
+            "\n```\n",
+        ))
+    
+    def _parse_sections(self, review_text: str) -> Dict[str, List[str]]:
+        """Extract issues and suggestions from the review text in one pass"""
+        sections: Dict[str, List[str]] = {"issues": [], "suggestions": []}
         if not review_text:
-            return []
-            
-        issues = []
-        in_issues_section = False
+            return sections
         
-        try:
-            for line in review_text.split('\n'):
-                # Check for section headers in various formats
-                if 'issue' in line.lower() or 'problem' in line.lower() or 'bug' in line.lower():
-                    in_issues_section = True
-                    continue
-                elif in_issues_section and (line.startswith('- ') or line.startswith('* ')):
-                    issues.append(line[2:].strip())
-                elif in_issues_section and (line.startswith('#') or line == '' or
-                                          'suggestion' in line.lower() or
-                                          'question' in line.lower() or
-                                          'summary' in line.lower()):
-                    in_issues_section = False
+        for match in _SECTION_RE.finditer(review_text):
+            section = _SECTION_NAMES[match.group("header").lower()]
+            sections[section].extend(
+                item.strip() for item in _BULLET_RE.findall(match.group("items"))
+            )
+        
+        # If we didn't find any formatted items, look for any lines with matching content
+        for section, pattern in _FALLBACK_RES.items():
+            if not sections[section]:
+                sections[section] = [
+                    line.strip() for line in pattern.findall(review_text) if len(line) > 10
+                ]
+        
+        # Also check for critical issues at the beginning
+        if "CRITICAL ISSUES FOUND" in review_text[:100]:
+            sections["issues"].insert(0, "CRITICAL ISSUES FOUND - Please fix before committing")
+        
+        # Limit to 10 items per section
+        return {section: items[:10] for section, items in sections.items()}
+    
+    def _index_line_refs(self, comments: List[str], diff: str) -> Dict[str, List[str]]:
+        """Map each "path:line" mentioned in the comments to the comments that mention it"""
+        # Keys are strings so the index survives the JSON round trip through
+        # the review cache and the daemon
+        paths = list(dict.fromkeys(_file_name(header) for header in _FILE_HEADER_RE.findall(diff)))
+        by_line: Dict[str, List[str]] = {}
+        for comment in comments:
+            matches = list(_LINE_REF_RE.finditer(comment))
+            if not matches:
+                continue
             
-            # If we didn't find any formatted issues, look for any lines with issue-like content
-            if not issues:
-                for line in review_text.split('\n'):
-                    if ('issue' in line.lower() or 'bug' in line.lower() or 'error' in line.lower() or 'fix' in line.lower()) and len(line) > 10:
-                        issues.append(line.strip())
+            # A line number only points somewhere together with its file, so a
+            # comment that names no file is only placed when the diff has one
+            files = [path for path in paths if _names_file(comment, path)]
+            if not files and len(paths) == 1:
+                files = paths
             
-            # Also check for critical issues at the beginning
-            if review_text and "CRITICAL ISSUES FOUND" in review_text[:100]:
-                issues.insert(0, "CRITICAL ISSUES FOUND - Please fix before committing")
-                
-            return issues[:10]  # Limit to 10 issues
-        except Exception:
-            return []
\ No newline at end of file
+            for match in matches:
+                first = int(match.group(1))
+                last = int(match.group(2) or first)
+                if not first <= last < first + MAX_LINE_REF_SPAN:
+                    last = first
+                for path in files:
+                    for line in range(first, last + 1):
+                        refs = by_line.setdefault(f"{path}:{line}", [])
+                        if comment not in refs:
+                            refs.append(comment)
+        return by_line
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+Long-lived review daemon and the AI reviewer that talks to it over a Unix socket.
+"""
+
+import os
+import sys
+import stat
+import time
+import socket
+import struct
+import tempfile
+import threading
+import subprocess
+import socketserver
+from typing import Dict, Any, Callable, Optional, Tuple
+from claude_pr_reviewer import json_utils
+from claude_pr_reviewer.interfaces import AIReviewerInterface
+from claude_pr_reviewer.review_cache import ReviewCache, DEFAULT_CACHE_TTL
+from claude_pr_reviewer.ai.claude_ai_reviewer import ClaudeAIReviewer, DEFAULT_MODEL
+
+
+# Every message is a JSON object preceded by its length as a 4 byte big-endian integer
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def daemon_supported() -> bool:
+    """Check whether this platform has Unix sockets and user ids to secure them with"""
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+
+def default_socket_path() -> str:
+    """Get the per-user socket path for the review daemon"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"claude-pr-reviewer-{os.getuid()}", "daemon.sock")
+
+
+def _private_dir(path: str) -> bool:
+    """Create the socket's directory if needed and check no other user can add or replace files in it"""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):
+        return False
+    # Requests carry the API key, so another user must not be able to put
+    # their own socket where we expect the daemon's
+    return (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _owned_by_user(sock: socket.socket, path: str) -> bool:
+    """Check that the process listening on the other end runs as this user"""
+    if not hasattr(os, "getuid"):
+        return False
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+        return uid == os.getuid()
+    # Without peer credentials, go by who owns the socket file
+    try:
+        return os.stat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def _send_frame(sock: socket.socket, message: Dict[str, Any]) -> None:
+    """Write one length-prefixed JSON message"""
+    data = json_utils.dumps(message)
+    sock.sendall(_FRAME_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes, raising ConnectionError if the peer goes away"""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Review daemon connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> Dict[str, Any]:
+    """Read one length-prefixed JSON message"""
+    (size,) = _FRAME_HEADER.unpack(_recv_exactly(sock, _FRAME_HEADER.size))
+    return json_utils.loads(_recv_exactly(sock, size))
+
+
+class ReviewDaemon:
+    """Class to serve reviews from a warm process so each push skips startup and TLS setup"""
+    
+    def __init__(self, socket_path: Optional[str] = None, idle_timeout: int = 15 * 60):
+        """Initialize with the socket to listen on and how long to stay up without requests"""
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._reviewers: Dict[Tuple[str, int, str, int], Tuple[ClaudeAIReviewer, threading.Lock]] = {}
+        self._reviewers_lock = threading.Lock()
+        self._last_request = time.monotonic()
+    
+    def _get_reviewer(
+        self,
+        api_key: str,
+        max_diff_size: int,
+        model: str,
+        cache_ttl: int
+    ) -> Tuple[ClaudeAIReviewer, threading.Lock]:
+        """Get the reviewer (and its lock) for an API key, keeping its HTTP session across requests"""
+        with self._reviewers_lock:
+            key = (api_key, max_diff_size, model, cache_ttl)
+            if key not in self._reviewers:
+                reviewer = ClaudeAIReviewer(
+                    api_key,
+                    cache=None if cache_ttl == 0 else ReviewCache(ttl=cache_ttl),
+                    max_diff_size=max_diff_size,
+                    model=model
+                )
+                self._reviewers[key] = (reviewer, threading.Lock())
+            return self._reviewers[key]
+    
+    def handle(self, sock: socket.socket) -> None:
+        """Answer one review request, streaming text frames before the final result"""
+        self._last_request = time.monotonic()
+        request = _recv_frame(sock)
+        cache_ttl = request.get("cache_ttl")
+        reviewer, lock = self._get_reviewer(
+            request["api_key"],
+            request.get("max_diff_size") or 10000,
+            request.get("model") or DEFAULT_MODEL,
+            DEFAULT_CACHE_TTL if cache_ttl is None else int(cache_ttl)
+        )
+        
+        # The reviewer's text callback is per instance, so requests with the
+        # same key take turns
+        with lock:
+            reviewer.on_text = lambda text: _send_frame(sock, {"text": text})
+            try:
+                review_data = reviewer.review_code(request["diff"], request["commit_msg"], request["branch"])
+            finally:
+                reviewer.on_text = None
+        _send_frame(sock, {"review": review_data})
+        self._last_request = time.monotonic()
+    
+    def serve(self) -> None:
+        """Listen on the socket until no request has come in for idle_timeout seconds"""
+        daemon = self
+        
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                try:
+                    daemon.handle(self.request)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Review daemon request failed: {e}", file=sys.stderr)
+        
+        if not daemon_supported():
+            print("Review daemon not started: Unix sockets are not supported here", file=sys.stderr)
+            return
+        if self.socket_path is None:
+            self.socket_path = default_socket_path()
+        socket_dir = os.path.dirname(self.socket_path)
+        if not _private_dir(socket_dir):
+            print(f"Review daemon not started: {socket_dir} is writable by other users", file=sys.stderr)
+            return
+        
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        
+        # Only the owner may connect, since requests carry the API key
+        old_umask = os.umask(0o077)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        
+        server.daemon_threads = True
+        server.timeout = 30
+        try:
+            while time.monotonic() - self._last_request < self.idle_timeout:
+                server.handle_request()
+        finally:
+            server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+
+class DaemonAIReviewer(AIReviewerInterface):
+    """Concrete implementation of AIReviewerInterface that reviews through the review daemon"""
+    
+    def __init__(
+        self,
+        api_key: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        max_diff_size: int = 10000,
+        model: str = DEFAULT_MODEL,
+        socket_path: Optional[str] = None,
+        cache_ttl: int = DEFAULT_CACHE_TTL
+    ):
+        """Initialize with Claude API key, a callback for streamed text, the model, the daemon socket and the cache TTL (0 disables it)"""
+        self.api_key = api_key
+        self.on_text = on_text
+        self.max_diff_size = max_diff_size
+        self.model = model
+        self.cache_ttl = cache_ttl
+        # Resolved on first connect, since the default path needs a user id that Windows doesn't have
+        self.socket_path = socket_path
+    
+    def review_code(self, diff: str, commit_msg: str, branch: str) -> Dict[str, Any]:
+        """Review the code through the daemon, starting it if needed and reviewing in-process as a last resort"""
+        sock = self._connect()
+        if sock is None:
+            return self._review_locally(diff, commit_msg, branch)
+        
+        try:
+            with sock:
+                _send_frame(sock, {
+                    "api_key": self.api_key,
+                    "max_diff_size": self.max_diff_size,
+                    "model": self.model,
+                    "cache_ttl": self.cache_ttl,
+                    "diff": diff,
+                    "commit_msg": commit_msg,
+                    "branch": branch,
+                })
+                while True:
+                    message = _recv_frame(sock)
+                    if "review" in message:
+                        return message["review"]
+                    if self.on_text and "text" in message:
+                        self.on_text(message["text"])
+        except (OSError, ValueError) as e:
+            print(f"Review daemon failed ({e}), reviewing directly.")
+            return self._review_locally(diff, commit_msg, branch)
+    
+    def _connect(self, wait: float = 2.0) -> Optional[socket.socket]:
+        """Connect to the daemon, starting it first if nothing is listening"""
+        if not daemon_supported():
+            return None
+        if self.socket_path is None:
+            self.socket_path = default_socket_path()
+        socket_dir = os.path.dirname(self.socket_path)
+        if not _private_dir(socket_dir):
+            print(f"Review daemon directory {socket_dir} is writable by other users, reviewing directly.")
+            return None
+        
+        started = False
+        deadline = time.monotonic() + wait
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+            else:
+                # Never send the API key to a socket another user is listening on
+                if _owned_by_user(sock, self.socket_path):
+                    return sock
+                sock.close()
+                print("Review daemon socket belongs to another user, reviewing directly.")
+                return None
+            
+            if not started:
+                self._start_daemon()
+                started = True
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(0.05)
+    
+    def _start_daemon(self) -> None:
+        """Start the daemon in the background, detached from this process"""
+        # Make sure the daemon can import this package even if it isn't installed
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        subprocess.Popen(
+            [sys.executable, "-m", "claude_pr_reviewer.ai.daemon_ai_reviewer", self.socket_path],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    
+    def _review_locally(self, diff: str, commit_msg: str, branch: str) -> Dict[str, Any]:
+        """Review in this process when the daemon can't be reached"""
+        reviewer = ClaudeAIReviewer(
+            self.api_key,
+            on_text=self.on_text,
+            cache=None if self.cache_ttl == 0 else ReviewCache(ttl=self.cache_ttl),
+            max_diff_size=self.max_diff_size,
+            model=self.model
+        )
+        return reviewer.review_code(diff, commit_msg, branch)
+
+
+if __name__ == "__main__":
+    ReviewDaemon(sys.argv[1] if len(sys.argv) > 1 else None).serve()
\ No newline at end of file
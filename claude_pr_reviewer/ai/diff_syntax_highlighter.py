@@ -3,7 +3,6 @@ Syntax highlighter for git diff output.
 """
 
 try:
-    from PyQt5.QtCore import QRegExp
     from PyQt5.QtGui import QColor, QTextCharFormat, QSyntaxHighlighter
     
     class DiffSyntaxHighlighter(QSyntaxHighlighter):
@@ -11,46 +10,43 @@ try:
         
         def __init__(self, document):
             super().__init__(document)
-            self.highlighting_rules = []
             
             # Added lines (green)
-            added_format = QTextCharFormat()
-            added_format.setBackground(QColor(204, 255, 204))  # Light green
-            added_format.setForeground(QColor(0, 100, 0))      # Dark green
-            self.highlighting_rules.append((QRegExp("^\\+.*"), added_format))
+            self.added_format = QTextCharFormat()
+            self.added_format.setBackground(QColor(204, 255, 204))  # Light green
+            self.added_format.setForeground(QColor(0, 100, 0))      # Dark green
             
             # Removed lines (red)
-            removed_format = QTextCharFormat()
-            removed_format.setBackground(QColor(255, 204, 204))  # Light red
-            removed_format.setForeground(QColor(139, 0, 0))      # Dark red
-            self.highlighting_rules.append((QRegExp("^-.*"), removed_format))
-            
-            # Header lines (blue)
-            header_format = QTextCharFormat()
-            header_format.setForeground(QColor(0, 0, 139))  # Dark blue
-            header_format.setFontWeight(2)  # Bold equivalent in QFont
-            self.highlighting_rules.append((QRegExp("^@@.*@@"), header_format))
+            self.removed_format = QTextCharFormat()
+            self.removed_format.setBackground(QColor(255, 204, 204))  # Light red
+            self.removed_format.setForeground(QColor(139, 0, 0))      # Dark red
             
             # File paths (purple)
-            file_format = QTextCharFormat()
-            file_format.setForeground(QColor(128, 0, 128))  # Purple
-            file_format.setFontWeight(2)  # Bold equivalent in QFont
-            self.highlighting_rules.append((QRegExp("^diff --git.*|^---.*|^\\+\\+\\+.*"), file_format))
+            self.file_format = QTextCharFormat()
+            self.file_format.setForeground(QColor(128, 0, 128))  # Purple
+            self.file_format.setFontWeight(2)  # Bold equivalent in QFont
             
             # Chunk headers
-            chunk_format = QTextCharFormat()
-            chunk_format.setBackground(QColor(232, 232, 255))  # Light lavender
-            chunk_format.setForeground(QColor(70, 70, 70))     # Dark gray
-            self.highlighting_rules.append((QRegExp("^@@ .*"), chunk_format))
-
+            self.chunk_format = QTextCharFormat()
+            self.chunk_format.setBackground(QColor(232, 232, 255))  # Light lavender
+            self.chunk_format.setForeground(QColor(70, 70, 70))     # Dark gray
+        
         def highlightBlock(self, text):
             """Apply syntax highlighting to the given block of text"""
-            for pattern, format in self.highlighting_rules:
-                expression = QRegExp(pattern)
-                index = expression.indexIn(text)
-                if index >= 0:
-                    length = expression.matchedLength()
-                    self.setFormat(0, length, format)
+            # Every kind of diff line is identified by how it starts, so look
+            # at the prefix instead of running regexes over each line
+            first = text[:1]
+            if first == "+":
+                format = self.file_format if text.startswith("+++") else self.added_format
+            elif first == "-":
+                format = self.file_format if text.startswith("---") else self.removed_format
+            elif first == "@" and text.startswith("@@"):
+                format = self.chunk_format
+            elif first == "d" and text.startswith("diff --git"):
+                format = self.file_format
+            else:
+                return
+            self.setFormat(0, len(text), format)
 except ImportError:
     # Define a dummy class for when PyQt5 is not available
     class DiffSyntaxHighlighter:
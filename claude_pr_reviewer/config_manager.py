@@ -3,8 +3,12 @@ Configuration manager for Claude PR Reviewer.
 """
 
 import os
-import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from claude_pr_reviewer import json_utils
+
+
+# Parsed config files by path, along with the mtime they were read at
+_config_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
 
 
 class ConfigManager:
@@ -13,16 +17,29 @@ class ConfigManager:
     def __init__(self, config_path: str = "~/.claude_pr_reviewer.json"):
         """Initialize with config file path"""
         self.config_path = os.path.expanduser(config_path)
+        self._written: Optional[bytes] = None
         self.config = self._load_config()
+        self._dirty = False
+        self._batching = 0
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r') as f:
-                    return json.load(f)
-            else:
-                return self._create_default_config()
+            # Open first and stat the open file, so a missing config costs one
+            # failed open rather than a stat followed by an open
+            with open(self.config_path, 'rb') as f:
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                
+                # Skip reading and parsing if the file hasn't changed since last time
+                cached = _config_cache.get(self.config_path)
+                if cached and cached[0] == mtime_ns:
+                    return dict(cached[1])
+                
+                config = json_utils.loads(f.read())
+            _config_cache[self.config_path] = (mtime_ns, config)
+            return dict(config)
+        except FileNotFoundError:
+            return self._create_default_config()
         except Exception as e:
             print(f"Error loading config: {e}")
             return self._create_default_config()
@@ -33,34 +50,75 @@ class ConfigManager:
             "api_key": "",
             "model": "claude-3-haiku-20240307",
             "max_diff_size": 10000,  # Max characters to send to Claude
+            "use_daemon": False,  # Review through a background process that stays warm between pushes
+            "review_cache_ttl": 24 * 60 * 60,  # Seconds to reuse the review of an unchanged diff, 0 to disable
         }
         
-        # Prompt for API key if not in environment
+        # Use the API key from the environment without writing anything to disk
         api_key = os.environ.get("CLAUDE_API_KEY")
-        if not api_key:
-            print("Claude API key not found.")
-            api_key = input("Please enter your Claude API key: ").strip()
+        if api_key:
+            config["api_key"] = api_key
+            return config
         
-        config["api_key"] = api_key
+        # Otherwise prompt for it
+        print("Claude API key not found.")
+        config["api_key"] = input("Please enter your Claude API key: ").strip()
         
         # Save the config
         self._save_config(config)
         return config
     
     def _save_config(self, config: Dict[str, Any]) -> None:
-        """Save configuration to file"""
+        """Save configuration to file, replacing it atomically"""
+        payload = json_utils.dumps(config, indent=True)
+        if payload == self._written:
+            return
+        
+        tmp_path = f"{self.config_path}.{os.getpid()}.tmp"
         try:
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            # The config holds the API key, so only the owner may read it
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
+            self._written = payload
+            # Later loads of the file we just wrote can skip parsing it
+            _config_cache[self.config_path] = (os.stat(self.config_path).st_mtime_ns, dict(config))
         except Exception as e:
             print(f"Error saving config: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
     
     def get(self, key: str) -> Any:
         """Get configuration value"""
         return self.config.get(key)
     
     def set(self, key: str, value: Any) -> None:
-        """Set configuration value"""
-        self.config[key] = value
-        self._save_config(self.config)
\ No newline at end of file
+        """Set configuration value, writing it to the file unless inside a with block"""
+        if key not in self.config or self.config[key] != value:
+            self.config[key] = value
+            self._dirty = True
+            if not self._batching:
+                self.flush()
+    
+    def __enter__(self) -> "ConfigManager":
+        """Hold back writes from set() until the with block ends, to save several values at once"""
+        self._batching += 1
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        """Write the values set inside the with block"""
+        self._batching -= 1
+        if not self._batching:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write the configuration to the file if it has changed since it was loaded or saved"""
+        if self._dirty:
+            self._save_config(self.config)
+            self._dirty = False
\ No newline at end of file
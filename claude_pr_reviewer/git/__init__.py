@@ -3,5 +3,6 @@ Git implementation classes.
 """
 
 from .git_cli import GitCLI
+from .pygit2_git import Pygit2Git, PYGIT2_AVAILABLE
 
-__all__ = ['GitCLI']
\ No newline at end of file
+__all__ = ['GitCLI', 'Pygit2Git', 'PYGIT2_AVAILABLE']
\ No newline at end of file
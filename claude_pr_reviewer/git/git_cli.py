@@ -2,117 +2,211 @@
 Git CLI implementation using subprocess.
 """
 
+import shutil
 import subprocess
+from typing import Dict, List, NamedTuple, Optional
 from claude_pr_reviewer.interfaces import GitInterface
 
 
+# Resolved once, so each git call execs it directly instead of searching PATH again
+GIT = shutil.which("git") or "git"
+
+# Generated files that add a lot of noise (and prompt tokens) but nothing worth reviewing
+DIFF_EXCLUDES = (
+    ":(exclude)*.lock",
+    ":(exclude)*package-lock.json",
+    ":(exclude)*.min.js",
+    ":(exclude)*.min.css",
+    ":(exclude)*.map",
+)
+
+# Most diff output read from git; anything past this is cut off instead of held in memory
+MAX_DIFF_BYTES = 8 * 1024 * 1024
+
+
+def decode_limited(data: bytes, max_bytes: int) -> str:
+    """Decode diff output, cutting it at the last full line within max_bytes if it is longer"""
+    if len(data) <= max_bytes:
+        return data.decode("utf-8", errors="replace")
+    cut = data.rfind(b"\n", 0, max_bytes) + 1 or max_bytes
+    return data[:cut].decode("utf-8", errors="replace") + f"...[diff truncated after {cut} bytes]...\n"
+
+
+class RepoStatus(NamedTuple):
+    """What git status reports about HEAD, its upstream and the index"""
+    has_commits: bool
+    upstream: Optional[str]
+    ahead: Optional[int]
+    staged: bool
+
+
 class GitCLI(GitInterface):
     """Concrete implementation of GitInterface using subprocess"""
     
+    def __init__(self, max_bytes: int = MAX_DIFF_BYTES):
+        """Initialize with the most diff output to read, and the caches for repository status and commit details"""
+        self.max_bytes = max_bytes
+        self._status: Optional[RepoStatus] = None
+        self._details: Dict[str, str] = {}
+    
+    def invalidate(self) -> None:
+        """Forget cached lookups, for callers that change the repository between calls"""
+        self._status = None
+        self._details.clear()
+    
+    def _diff(self, *args: str) -> Optional[str]:
+        """Run git diff without colors and generated files, or None if it failed"""
+        with subprocess.Popen(
+            [GIT, "diff", "--no-color", *args, "--", *DIFF_EXCLUDES],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        ) as proc:
+            # Read one byte past the limit to tell whether there is more, and
+            # stop git there rather than letting it write out the rest
+            output = proc.stdout.read(self.max_bytes + 1)
+            if len(output) > self.max_bytes:
+                proc.kill()
+                return decode_limited(output, self.max_bytes)
+        if proc.returncode != 0:
+            return None
+        return decode_limited(output, self.max_bytes)
+    
+    def _quiet_diff(self, *args: str) -> Optional[bool]:
+        """Check whether git diff has any output without producing it, or None if it failed"""
+        result = subprocess.run(
+            [GIT, "diff", "--quiet", *args, "--", *DIFF_EXCLUDES],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if result.returncode in (0, 1):
+            return result.returncode == 1
+        return None
+    
+    def _repo_status(self) -> RepoStatus:
+        """Find out whether HEAD exists, its upstream and how far ahead of it, and whether anything is staged"""
+        if self._status is None:
+            # A single git status answers all of these; untracked files are
+            # never part of the diff, so don't spend time looking for them
+            result = subprocess.run(
+                [GIT, "status", "--porcelain=v2", "--branch", "-z", "--untracked-files=no"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            has_commits = False
+            upstream = None
+            ahead = None
+            staged = False
+            fields = result.stdout.decode("utf-8", errors="replace").split("\0")
+            i = 0
+            while i < len(fields):
+                field = fields[i]
+                if field.startswith("# branch.oid "):
+                    has_commits = field != "# branch.oid (initial)"
+                elif field.startswith("# branch.upstream "):
+                    upstream = field[len("# branch.upstream "):]
+                elif field.startswith("# branch.ab "):
+                    ahead = int(field.split()[2])
+                elif field[:2] in ("1 ", "2 "):
+                    # The first status letter is the index side; "." means unchanged
+                    staged = staged or field[2] != "."
+                    if field[0] == "2":
+                        # Renames are followed by their original path
+                        i += 1
+                elif field.startswith("u "):
+                    staged = True
+                i += 1
+            self._status = RepoStatus(has_commits, upstream, ahead, staged)
+        return self._status
+    
+    def _branch_ranges(self, upstream: Optional[str]) -> List[str]:
+        """Get the commit ranges to try, in order, for the commits that will be pushed"""
+        ranges = []
+        # Prefer the diff between HEAD and the remote tracking branch
+        if upstream:
+            ranges.append(upstream + "..HEAD")
+        # If there's no upstream branch, get the diff of all commits that will be pushed
+        ranges.append("origin/main...HEAD")
+        # Fallback to just showing the diff of the latest commit
+        ranges.append("HEAD~1..HEAD")
+        return ranges
+    
+    def has_changes(self) -> bool:
+        """Check whether there is anything to review using git status and git diff --quiet"""
+        status = self._repo_status()
+        if status.staged and self._quiet_diff("--staged"):
+            return True
+        
+        if not status.has_commits:
+            return bool(self._quiet_diff())
+        
+        # Nothing staged and nothing ahead of the upstream branch means nothing to push
+        if status.upstream and status.ahead == 0:
+            return False
+        
+        for diff_range in self._branch_ranges(status.upstream):
+            changed = self._quiet_diff(diff_range)
+            if changed is not None:
+                return changed
+        return False
+    
     def get_diff(self) -> str:
         """Get the diff that would be pushed using git diff command"""
         diff = ""
+        status = self._repo_status()
         
         # Check for staged changes
-        try:
-            staged_diff = subprocess.check_output(
-                ["git", "diff", "--staged"],
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-            if staged_diff.strip():
+        if status.staged:
+            staged_diff = self._diff("--staged")
+            if staged_diff and not staged_diff.isspace():
                 diff += staged_diff
-        except subprocess.CalledProcessError:
-            pass
-
+        
         # Only proceed with other checks if we don't have staged changes yet
-        if not diff.strip():
-            # Check if there's a HEAD reference (at least one commit)
-            has_commits = True
-            try:
-                subprocess.check_output(
-                    ["git", "rev-parse", "HEAD"],
-                    stderr=subprocess.STDOUT,
-                    universal_newlines=True
-                )
-            except subprocess.CalledProcessError:
-                has_commits = False
-            
+        if not diff:
             # If we have no commits yet, get all changes
-            if not has_commits:
-                try:
-                    # Get all changes
-                    return subprocess.check_output(
-                        ["git", "diff"],
-                        stderr=subprocess.STDOUT,
-                        universal_newlines=True
-                    )
-                except subprocess.CalledProcessError:
-                    return ""
+            if not status.has_commits:
+                return self._diff() or ""
             
-            # If we have commits, try to get the diff between HEAD and the remote tracking branch
-            try:
-                remote_branch = subprocess.check_output(
-                    ["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"], 
-                    stderr=subprocess.STDOUT,
-                    universal_newlines=True
-                ).strip()
-                
-                branch_diff = subprocess.check_output(
-                    ["git", "diff", remote_branch + "..HEAD"],
-                    stderr=subprocess.STDOUT,
-                    universal_newlines=True
-                )
-                if branch_diff.strip():
-                    diff += branch_diff
-            except subprocess.CalledProcessError:
-                # If there's no upstream branch, get the diff of all commits that will be pushed
-                try:
-                    branch_diff = subprocess.check_output(
-                        ["git", "diff", "origin/main...HEAD"],
-                        stderr=subprocess.STDOUT,
-                        universal_newlines=True
-                    )
-                    if branch_diff.strip():
-                        diff += branch_diff
-                except subprocess.CalledProcessError:
-                    # Fallback to just showing the diff of the latest commit
-                    try:
-                        commit_diff = subprocess.check_output(
-                            ["git", "diff", "HEAD~1..HEAD"],
-                            stderr=subprocess.STDOUT,
-                            universal_newlines=True
-                        )
-                        if commit_diff.strip():
-                            diff += commit_diff
-                    except subprocess.CalledProcessError:
-                        pass
+            # Skip the diff entirely when everything has already been pushed
+            if not (status.upstream and status.ahead == 0):
+                # Use the first range git can resolve
+                for diff_range in self._branch_ranges(status.upstream):
+                    branch_diff = self._diff(diff_range)
+                    if branch_diff is not None:
+                        if branch_diff and not branch_diff.isspace():
+                            diff += branch_diff
+                        break
         
         # Debug output
-        if not diff.strip():
+        if not diff or diff.isspace():
             print("No diff detected in any of the tried methods.")
         else:
-            print(f"Found diff with {len(diff.splitlines())} lines of changes.")
+            # Count newlines rather than building a list of every line just to measure it
+            line_count = diff.count("\n")
+            print(f"Found diff with {line_count} lines of changes.")
         
         return diff
     
     def get_commit_message(self) -> str:
         """Get the latest commit message or a placeholder if no commits yet"""
-        try:
-            return subprocess.check_output(
-                ["git", "log", "-1", "--pretty=%B"],
-                universal_newlines=True
-            ).strip()
-        except subprocess.CalledProcessError:
-            # No commits yet
-            return "Initial commit"
+        if "commit_message" not in self._details:
+            try:
+                self._details["commit_message"] = subprocess.check_output(
+                    [GIT, "log", "-1", "--pretty=%B"],
+                    universal_newlines=True
+                ).strip()
+            except subprocess.CalledProcessError:
+                # No commits yet
+                self._details["commit_message"] = "Initial commit"
+        return self._details["commit_message"]
     
     def get_branch_name(self) -> str:
         """Get the current branch name or a placeholder if not on a branch"""
-        try:
-            return subprocess.check_output(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                universal_newlines=True
-            ).strip()
-        except subprocess.CalledProcessError:
-            return "main"
\ No newline at end of file
+        if "branch_name" not in self._details:
+            try:
+                self._details["branch_name"] = subprocess.check_output(
+                    [GIT, "rev-parse", "--abbrev-ref", "HEAD"],
+                    universal_newlines=True
+                ).strip()
+            except subprocess.CalledProcessError:
+                self._details["branch_name"] = "main"
+        return self._details["branch_name"]
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Git implementation using pygit2 (libgit2) in-process.
+"""
+
+import os
+import threading
+from fnmatch import fnmatch
+from typing import List
+from claude_pr_reviewer.git.git_cli import DIFF_EXCLUDES, MAX_DIFF_BYTES, decode_limited
+
+try:
+    import pygit2
+    
+    from claude_pr_reviewer.interfaces import GitInterface
+    
+    # The same generated files GitCLI leaves out, as globs matched against paths
+    EXCLUDE_GLOBS = tuple(spec.replace(":(exclude)", "", 1) for spec in DIFF_EXCLUDES)
+    
+    class Pygit2Git(GitInterface):
+        """Concrete implementation of GitInterface using pygit2, without spawning git processes"""
+        
+        def __init__(self, path: str = ".", max_bytes: int = MAX_DIFF_BYTES):
+            """Open the repository containing path once for all lookups, reading at most max_bytes of diff"""
+            self.max_bytes = max_bytes
+            repo_path = pygit2.discover_repository(os.path.abspath(path))
+            if repo_path is None:
+                raise ValueError(f"Not a git repository: {path}")
+            self.repo = pygit2.Repository(repo_path)
+            # PRReviewer.run reads the diff, message and branch from worker threads,
+            # and a libgit2 repository shouldn't be used from several at once
+            self._lock = threading.Lock()
+        
+        def _included(self, patch) -> bool:
+            """Check whether a patch is for a file that should be reviewed"""
+            path = patch.delta.new_file.path or patch.delta.old_file.path
+            return not any(fnmatch(path, glob) for glob in EXCLUDE_GLOBS)
+        
+        def _patch_text(self, diff) -> str:
+            """Get the patch text of a diff without generated files"""
+            # Patches are generated as the diff is iterated, so stop once past the limit
+            parts = []
+            size = 0
+            for patch in diff:
+                if self._included(patch):
+                    parts.append(patch.data)
+                    size += len(parts[-1])
+                    if size > self.max_bytes:
+                        break
+            return decode_limited(b"".join(parts), self.max_bytes)
+        
+        def _staged_diff(self):
+            """Diff the index against HEAD, or against an empty tree before the first commit"""
+            if self.repo.head_is_unborn:
+                empty_tree = self.repo[self.repo.TreeBuilder().write()]
+                return self.repo.diff(empty_tree, cached=True)
+            return self.repo.diff("HEAD", cached=True)
+        
+        def _branch_diffs(self) -> List:
+            """Get the diffs to try, in order, for the commits that will be pushed"""
+            head = self.repo.head.peel(pygit2.Commit)
+            diffs = []
+            
+            # Prefer the diff between HEAD and the remote tracking branch
+            upstream = None
+            if not self.repo.head_is_detached:
+                try:
+                    upstream = self.repo.branches.local[self.repo.head.shorthand].upstream
+                except (KeyError, pygit2.GitError):
+                    upstream = None
+            if upstream is not None:
+                diffs.append(lambda: self.repo.diff(upstream.peel(pygit2.Commit), head))
+            
+            # If there's no upstream branch, get the diff of all commits that will be pushed
+            def main_diff():
+                main = self.repo.revparse_single("origin/main").peel(pygit2.Commit)
+                base = self.repo.merge_base(main.id, head.id)
+                if base is None:
+                    raise KeyError("origin/main has no common ancestor with HEAD")
+                return self.repo.diff(self.repo[base], head)
+            diffs.append(main_diff)
+            
+            # Fallback to just showing the diff of the latest commit
+            diffs.append(lambda: self.repo.diff(self.repo.revparse_single("HEAD~1").peel(pygit2.Commit), head))
+            return diffs
+        
+        def _pushed_diff(self):
+            """Get the diff that would be pushed, or None if none of the ranges resolve"""
+            staged = self._staged_diff()
+            if any(self._included(patch) for patch in staged):
+                return staged
+            
+            # If we have no commits yet, get all changes
+            if self.repo.head_is_unborn:
+                return self.repo.diff()
+            
+            # Use the first range that resolves
+            for make_diff in self._branch_diffs():
+                try:
+                    return make_diff()
+                except (KeyError, ValueError, pygit2.GitError):
+                    continue
+            return None
+        
+        def has_changes(self) -> bool:
+            """Check whether there is anything to review"""
+            with self._lock:
+                diff = self._pushed_diff()
+                return diff is not None and any(self._included(patch) for patch in diff)
+        
+        def get_diff(self) -> str:
+            """Get the diff that would be pushed"""
+            with self._lock:
+                diff = self._pushed_diff()
+                diff_text = self._patch_text(diff) if diff is not None else ""
+            
+            # Debug output
+            if not diff_text or diff_text.isspace():
+                print("No diff detected in any of the tried methods.")
+            else:
+                # Count newlines rather than building a list of every line just to measure it
+                line_count = diff_text.count("\n")
+                print(f"Found diff with {line_count} lines of changes.")
+            
+            return diff_text
+        
+        def get_commit_message(self) -> str:
+            """Get the latest commit message or a placeholder if no commits yet"""
+            with self._lock:
+                if self.repo.head_is_unborn:
+                    return "Initial commit"
+                return self.repo.head.peel(pygit2.Commit).message.strip()
+        
+        def get_branch_name(self) -> str:
+            """Get the current branch name or a placeholder if not on a branch"""
+            with self._lock:
+                if self.repo.head_is_unborn:
+                    return "main"
+                if self.repo.head_is_detached:
+                    return "HEAD"
+                return self.repo.head.shorthand
+    
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+    
+    # Define a dummy class for when pygit2 is not available
+    class Pygit2Git:
+        """Dummy Pygit2Git class when pygit2 is not available"""
+        def __init__(self, *args, **kwargs):
+            raise ImportError("pygit2 is not installed")
\ No newline at end of file
@@ -8,6 +8,10 @@ from abc import ABC, abstractmethod
 class GitInterface(ABC):
     """Interface for git operations"""
     
+    def has_changes(self) -> bool:
+        """Quickly check whether there is anything to push (defaults to True)"""
+        return True
+    
     @abstractmethod
     def get_diff(self) -> str:
         """Get the diff that would be pushed"""
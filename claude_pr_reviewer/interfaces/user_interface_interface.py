@@ -9,6 +9,14 @@ from typing import Dict, Any
 class UserInterfaceInterface(ABC):
     """Interface for user interaction"""
     
+    def prepare(self) -> None:
+        """Set up anything needed before showing the review (optional)"""
+        pass
+    
+    def show_progress(self, text: str) -> None:
+        """Display a piece of the review as it is streamed in (optional)"""
+        pass
+    
     @abstractmethod
     def show_review(self, review_data: Dict[str, Any]) -> bool:
         """Display the review and get user confirmation to proceed"""
@@ -2,6 +2,7 @@
 PR Reviewer - The main class that coordinates the PR review process.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from claude_pr_reviewer.interfaces import GitInterface, AIReviewerInterface, UserInterfaceInterface
 
@@ -23,17 +24,32 @@ class PRReviewer:
     def run(self) -> int:
         """Run the PR review process, return exit code (0 for success)"""
         try:
-            # Get the diff and related info
-            diff = self.git.get_diff()
-            if not diff.strip():
+            # Cheap check first so pushes with nothing to review skip building the diff
+            if not self.git.has_changes():
                 print("No changes to review. Proceeding with push.")
                 return 0  # No changes to review
             
-            commit_msg = self.git.get_commit_message()
-            branch_name = self.git.get_branch_name()
-            
-            # Get AI review
-            review_data = self.ai_reviewer.review_code(diff, commit_msg, branch_name)
+            # Get the diff and related info; each is a separate git process,
+            # so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                diff_future = executor.submit(self.git.get_diff)
+                commit_msg_future = executor.submit(self.git.get_commit_message)
+                branch_name_future = executor.submit(self.git.get_branch_name)
+                
+                diff = diff_future.result()
+                commit_msg = commit_msg_future.result()
+                branch_name = branch_name_future.result()
+                
+                if not diff or diff.isspace():
+                    print("No changes to review. Proceeding with push.")
+                    return 0  # No changes to review
+                
+                # Get AI review in the background and use the wait to set up the UI
+                review_future = executor.submit(
+                    self.ai_reviewer.review_code, diff, commit_msg, branch_name
+                )
+                self.ui.prepare()
+                review_data = review_future.result()
             
             if "error" in review_data:
                 self.ui.show_error(f"Error during review: {review_data['error']}")
@@ -0,0 +1,82 @@
+"""
+On-disk cache of review results for Claude PR Reviewer.
+"""
+
+import os
+import time
+import hashlib
+from typing import Dict, Any, Optional
+from claude_pr_reviewer import json_utils
+
+
+# How long a cached review is reused, in seconds
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+
+class ReviewCache:
+    """Class to cache review results keyed on a hash of the reviewed content"""
+    
+    def __init__(
+        self,
+        cache_dir: str = "~/.claude_pr_reviewer_cache",
+        ttl: int = DEFAULT_CACHE_TTL,
+        max_entries: int = 100
+    ):
+        """Initialize with cache directory, entry lifetime in seconds and size cap"""
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.ttl = ttl
+        self.max_entries = max_entries
+    
+    def make_key(self, *parts: str) -> str:
+        """Build a cache key from the inputs that determine a review"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode("utf-8", errors="replace"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached review for key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl:
+                return None
+            with open(path, 'rb') as f:
+                return json_utils.loads(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def set(self, key: str, review_data: Dict[str, Any]) -> None:
+        """Store a review for key, replacing the file atomically"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(json_utils.dumps(review_data))
+            os.replace(tmp_path, path)
+            self._prune()
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving review cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def _path(self, key: str) -> str:
+        """Get the file path for a cache key"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _prune(self) -> None:
+        """Remove the oldest entries once the cache grows past max_entries"""
+        with os.scandir(self.cache_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
\ No newline at end of file
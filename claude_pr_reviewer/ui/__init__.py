@@ -2,13 +2,33 @@
 User interface implementation classes.
 """
 
-try:
-    from .pyqt_ui import PyQtUI
-    GUI_TOOLKIT = "PyQt5"
-except ImportError:
-    # PyQt5 not available
-    GUI_TOOLKIT = "Terminal"
+import os
+import sys
+import importlib.util
+
+# Only check that PyQt5 is installed; importing it takes hundreds of
+# milliseconds, which runs that end up in the terminal shouldn't pay
+GUI_TOOLKIT = "PyQt5" if importlib.util.find_spec("PyQt5") is not None else "Terminal"
 
 from .terminal_ui import TerminalUI
 
-__all__ = ['PyQtUI', 'TerminalUI', 'GUI_TOOLKIT']
\ No newline at end of file
+
+def __getattr__(name):
+    """Import the PyQt5 UI the first time it is asked for"""
+    if name == "PyQtUI":
+        from .pyqt_ui import PyQtUI
+        globals()["PyQtUI"] = PyQtUI
+        return PyQtUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def gui_available() -> bool:
+    """Check whether a GUI can be shown, i.e. PyQt5 is installed and we're not headless"""
+    if GUI_TOOLKIT != "PyQt5" or os.environ.get("CI"):
+        return False
+    # X11 and Wayland sessions advertise themselves; macOS and Windows always have a display
+    if sys.platform.startswith("linux") or "bsd" in sys.platform:
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+__all__ = ['PyQtUI', 'TerminalUI', 'GUI_TOOLKIT', 'gui_available']
\ No newline at end of file
@@ -2,28 +2,266 @@
 PyQt5-based UI implementation.
 """
 
-from typing import Dict, Any, List
+import re
+import sys
+import html
+from typing import Dict, Any, List, Set
+
+# Words used to relate review comments to parts of the diff
+_WORD_RE = re.compile(r"[a-z]+")
+
+# The new-file line range of a hunk header, e.g. "@@ -10,7 +12,9 @@"
+_HUNK_HEADER_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+# Widget style sheet for the review window
+_MAIN_QSS = """
+QMainWindow {
+    background-color: #f5f5f5;
+}
+QTabWidget::pane {
+    border: 1px solid #cccccc;
+    background-color: white;
+    border-radius: 4px;
+}
+QTabBar::tab {
+    background-color: #e0e0e0;
+    color: #333333;
+    border: 1px solid #cccccc;
+    border-bottom: none;
+    border-top-left-radius: 4px;
+    border-top-right-radius: 4px;
+    padding: 6px 12px;
+    min-width: 80px;
+}
+QTabBar::tab:selected {
+    background-color: white;
+    border-bottom: 1px solid white;
+}
+QTextEdit, QTextBrowser {
+    background-color: #ffffff;
+    border: 1px solid #cccccc;
+    border-radius: 4px;
+    padding: 4px;
+    color: #333333;
+    font-family: 'Consolas', 'Monaco', monospace;
+}
+QPushButton {
+    background-color: #4b7bec;
+    color: white;
+    border: none;
+    border-radius: 4px;
+    padding: 8px 16px;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: #3867d6;
+}
+QPushButton#cancel {
+    background-color: #fc5c65;
+}
+QPushButton#cancel:hover {
+    background-color: #eb3b5a;
+}
+"""
+
+# One style sheet for every review document, so each element only carries a short
+# class name instead of repeating its inline style
+_REVIEW_CSS = """
+.file { color: #8e44ad; font-weight: bold; }
+.chunk { color: #3498db; background-color: #eef6fc; }
+.add { color: #27ae60; background-color: #e6ffec; }
+.del { color: #c0392b; background-color: #ffebe9; }
+.ctx { color: #34495e; }
+hr { border: 0; height: 1px; background-color: #eee; margin: 5px 0; }
+h2 { color: #2c3e50; border-bottom: 1px solid #ecf0f1; padding-bottom: 10px; }
+h2.issues { color: #c0392b; margin-top: 30px; }
+h2.suggestions { color: #2980b9; margin-top: 30px; }
+h3 { color: #2c3e50; margin-top: 0; }
+h4 { margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px; }
+h4.issues { color: #c0392b; }
+h4.suggestions { color: #2980b9; }
+ul.issues { color: #e74c3c; }
+ul.suggestions { color: #3498db; }
+ul.comments { color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px; }
+li { margin-bottom: 12px; }
+li.comment { margin-bottom: 10px; }
+div.suggestions { margin-top: 15px; }
+.review { font-family: Arial, sans-serif; line-height: 1.6; }
+.review-text { color: #34495e; margin-bottom: 20px; }
+.summary { background-color: #f8f9fa; border: 1px solid #ddd; padding: 10px; margin-bottom: 20px; border-radius: 5px; }
+.summary-text { color: #34495e; }
+.comment-box { border-left: 4px solid #3498db; background-color: #f8f9fa; padding: 15px; margin: 20px 0;
+               border-radius: 0 5px 5px 0; font-family: Arial, sans-serif; font-size: 14px; color: #333333;
+               box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+"""
+
+# Longest diff line rendered in full; minified or generated lines beyond this are cropped
+MAX_LINE_CHARS = 2000
+
+# HTML for each kind of diff line, filled in with the escaped line
+_FILE_LINE = '<span class="file">%s</span>'
+_CHUNK_LINE = '<span class="chunk">%s</span><hr>'
+_ADDED_LINE = '<span class="add">%s</span>'
+_REMOVED_LINE = '<span class="del">%s</span>'
+_CONTEXT_LINE = '<span class="ctx">%s</span>'
+
+
+def _escape(text: str) -> str:
+    """Escape review text for HTML so code in comments shows up as written"""
+    return html.escape(text, quote=False)
+
+
+def _render_line(line: str) -> str:
+    """Get the styled HTML for one line of the diff"""
+    first = line[:1]
+    if first == "+":
+        template = _FILE_LINE if line.startswith("+++") else _ADDED_LINE
+    elif first == "-":
+        template = _FILE_LINE if line.startswith("---") else _REMOVED_LINE
+    elif first == "@" and line.startswith("@@"):
+        template = _CHUNK_LINE
+    elif first == "d" and line.startswith("diff --git"):
+        template = _FILE_LINE
+    else:
+        template = _CONTEXT_LINE
+    if len(line) > MAX_LINE_CHARS:
+        line = f"{line[:MAX_LINE_CHARS]} ...[+{len(line) - MAX_LINE_CHARS} chars]"
+    return template % _escape(line)
+
+
+# An inline box of review comments, which has to step out of the surrounding <pre>
+_COMMENT_BOX = """</pre>
+<div class="comment-box">
+%s
+</div>
+<pre>"""
+_COMMENT_LIST = """<div class="%s">
+    <h4 class="%s">%s</h4>
+    <ul class="comments">
+%s
+</ul></div>"""
+_COMMENT_ITEM = '<li class="comment">%s</li>'
+
+
+def _comment_list(comments: List[str], title: str, kind: str) -> str:
+    """Get the HTML for one titled list of issues or suggestions"""
+    return _COMMENT_LIST % (kind, kind, title, "\n".join([_COMMENT_ITEM % _escape(comment) for comment in comments]))
+
+
+def _comment_box(issues: List[str], issues_title: str, suggestions: List[str], suggestions_title: str) -> str:
+    """Get the HTML for an inline box with the given issues and suggestions"""
+    lists = []
+    if issues:
+        lists.append(_comment_list(issues, issues_title, "issues"))
+    if suggestions:
+        lists.append(_comment_list(suggestions, suggestions_title, "suggestions"))
+    return _COMMENT_BOX % "\n".join(lists)
+
+
+def _keywords(text: str) -> Set[str]:
+    """Get the words in text that are long enough to be meaningful for matching"""
+    return {word for word in _WORD_RE.findall(text.lower()) if len(word) > 3}
+
+
+def _keyword_index(comments: List[str]) -> Dict[str, Set[int]]:
+    """Map each keyword to the indexes of the comments that contain it"""
+    index: Dict[str, Set[int]] = {}
+    for i, comment in enumerate(comments):
+        for word in _keywords(comment):
+            index.setdefault(word, set()).add(i)
+    return index
+
+
+def _matching_comments(
+    comments: List[str],
+    index: Dict[str, Set[int]],
+    words: Set[str],
+    referenced: Set[str] = frozenset()
+) -> List[str]:
+    """Get the comments that share a keyword with words or are in referenced, in their original order"""
+    matches: Set[int] = set()
+    for word in words:
+        matches |= index.get(word, set())
+    return [comment for i, comment in enumerate(comments) if i in matches or comment in referenced]
+
+
+def _hunk_comments(hunk_header: str, path: str, by_line: Dict[str, List[str]]) -> Set[str]:
+    """Get the comments that mention a line of path inside the hunk, using the reviewer's line index"""
+    match = _HUNK_HEADER_RE.match(hunk_header)
+    if not match or not by_line or not path:
+        return set()
+    start = int(match.group(1))
+    count = int(match.group(2) or 1)
+    comments: Set[str] = set()
+    for line in range(start, start + count):
+        comments.update(by_line.get(f"{path}:{line}", ()))
+    return comments
+
 
 try:
     from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout, QLabel, QPushButton, QTabWidget, 
                               QTextEdit, QMessageBox, QSplitter, QGridLayout,
-                              QTextBrowser, QScrollArea)
-    from PyQt5.QtCore import Qt, QRegExp
-    from PyQt5.QtGui import QFont, QColor, QTextCharFormat, QSyntaxHighlighter, QTextCursor
+                              QTextBrowser, QScrollArea, QPlainTextEdit)
+    from PyQt5.QtCore import Qt, QRegExp, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+    from PyQt5.QtGui import (QFont, QColor, QTextCharFormat, QSyntaxHighlighter, QTextCursor,
+                             QGuiApplication, QCursor, QTextDocument)
     
     from claude_pr_reviewer.interfaces import UserInterfaceInterface
+    from claude_pr_reviewer.ui import GUI_TOOLKIT
     from claude_pr_reviewer.ai import DiffSyntaxHighlighter
     
+    # Diffs longer than this are shown as highlighted plain text, with the
+    # comments in a side panel rather than inline
+    LARGE_DIFF_LINES = 2000
+    
+    # Lines inserted into the plain text view per event loop turn
+    DIFF_CHUNK_LINES = 500
+    
+    # Past this many lines the plain text view isn't highlighted at all, since
+    # coloring every block would take most of the time spent showing it
+    HIGHLIGHT_MAX_LINES = 20000
+    
+    class _HtmlReady(QObject):
+        """Carries finished HTML from a pool thread back to the GUI thread"""
+        ready = pyqtSignal(str)
+    
+    class _HtmlBuilder(QRunnable):
+        """Builds review HTML on a pool thread so the window can open and paint meanwhile"""
+        
+        def __init__(self, build):
+            super().__init__()
+            self.build = build
+            self.signals = _HtmlReady()
+        
+        def run(self):
+            try:
+                html_text = self.build()
+            except Exception as e:
+                html_text = "<p>Error rendering review: " + _escape(str(e)) + "</p>"
+            self.signals.ready.emit(html_text)
+    
     class PyQtUI(UserInterfaceInterface):
         """Concrete implementation of UserInterfaceInterface using PyQt5"""
         
+        def prepare(self) -> None:
+            """Create the Qt application up front while the review is running"""
+            if GUI_TOOLKIT == "PyQt5":
+                # Keep a reference so the application isn't garbage collected
+                self.app = QApplication.instance() or QApplication([])
+        
+        def show_progress(self, text: str) -> None:
+            """Echo the review to the terminal as it streams in, until the window is ready"""
+            # Called from the review worker thread, so don't touch any widgets here
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        
         def show_review(self, review_data: Dict[str, Any]) -> bool:
             """
             Display the review in a PyQt5 window and 
             return True if user confirms to proceed with push
             """
-            from claude_pr_reviewer.ui import GUI_TOOLKIT
             if GUI_TOOLKIT != "PyQt5":
                 return self._fallback_show_review(review_data)
                 
@@ -48,10 +286,18 @@ try:
             if "raw_response" not in review_data:
                 review_data["raw_response"] = {}
                 
-            # Extract diff from raw response if available
-            diff_text = ""
-            if "raw_response" in review_data and "diff" in review_data:
-                diff_text = review_data["diff"]
+            # Look up the fields once; everything below works on these locals
+            review_text = review_data["review_text"]
+            issues = review_data["issues"]
+            suggestions = review_data["suggestions"]
+            # The review text as HTML, shared by the Code Review and Summary tabs
+            review_html = _escape(review_text).replace('\n', '<br>')
+            
+            # The reviewer passes the diff along next to the review; without one
+            # there is nothing to show in the Code Review tab
+            diff_text = review_data.get("diff") or ""
+            if diff_text.isspace():
+                diff_text = ""
             
             # Create Qt application
             app = QApplication.instance() or QApplication([])
@@ -62,55 +308,7 @@ try:
                 self.window = QMainWindow()
                 self.window.setWindowTitle("Claude PR Review")
                 self.window.resize(1200, 800)
-                self.window.setStyleSheet("""
-                    QMainWindow {
-                        background-color: #f5f5f5;
-                    }
-                    QTabWidget::pane {
-                        border: 1px solid #cccccc;
-                        background-color: white;
-                        border-radius: 4px;
-                    }
-                    QTabBar::tab {
-                        background-color: #e0e0e0;
-                        color: #333333;
-                        border: 1px solid #cccccc;
-                        border-bottom: none;
-                        border-top-left-radius: 4px;
-                        border-top-right-radius: 4px;
-                        padding: 6px 12px;
-                        min-width: 80px;
-                    }
-                    QTabBar::tab:selected {
-                        background-color: white;
-                        border-bottom: 1px solid white;
-                    }
-                    QTextEdit, QTextBrowser {
-                        background-color: #ffffff;
-                        border: 1px solid #cccccc;
-                        border-radius: 4px;
-                        padding: 4px;
-                        color: #333333;
-                        font-family: 'Consolas', 'Monaco', monospace;
-                    }
-                    QPushButton {
-                        background-color: #4b7bec;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        padding: 8px 16px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #3867d6;
-                    }
-                    QPushButton#cancel {
-                        background-color: #fc5c65;
-                    }
-                    QPushButton#cancel:hover {
-                        background-color: #eb3b5a;
-                    }
-                """)
+                self.window.setStyleSheet(_MAIN_QSS)
                 
                 # Central widget and main layout
                 central_widget = QWidget()
@@ -141,223 +339,68 @@ try:
                     # Split view for code and comments
                     splitter = QSplitter(Qt.Horizontal)
                     
-                    # Create a single content area with inline comments
-                    diff_browser = QTextBrowser()
-                    diff_browser.setOpenExternalLinks(True)
-                    diff_browser.setLineWrapMode(QTextEdit.NoWrap)
-                    
                     # Set monospace font for code
                     code_font = QFont("Courier New", 10)
-                    diff_browser.setFont(code_font)
-                    
-                    # Process the diff and add inline comments
-                    # First get the overall review summary
-                    review_summary = review_data.get("review_text", "").replace('\n', '<br>')
                     
-                    # Extract issues and suggestions
-                    issues = review_data.get("issues", [])
-                    suggestions = review_data.get("suggestions", [])
-                    
-                    # Process the diff to add inline comments
                     diff_lines = diff_text.splitlines()
-                    processed_diff = []
-                    file_path = ""
-                    current_section = ""
-                    
-                    # Summary header at the top
-                    processed_diff.append("""
-                    <div style="background-color: #f8f9fa; border: 1px solid #ddd; padding: 10px; margin-bottom: 20px; border-radius: 5px;">
-                        <h3 style="color: #2c3e50; margin-top: 0;">Review Summary</h3>
-                        <div style="color: #34495e;">""" + review_summary + """</div>
-                    </div>
-                    """)
-                    
-                    processed_diff.append("<pre>")  # Start preformatted text
-                    
-                    for i, line in enumerate(diff_lines):
-                        # Colorize diff lines based on content
-                        styled_line = line
-                        
-                        # File headers (diff --git, +++ or ---)
-                        if line.startswith("diff --git") or line.startswith("+++") or line.startswith("---"):
-                            if line.startswith("diff --git"):
-                                # Extract file path
-                                parts = line.split(" ")
-                                if len(parts) > 2:
-                                    file_path = parts[2][2:]  # Remove a/ prefix
-                            
-                            styled_line = '<span style="color: #8e44ad; font-weight: bold;">' + line + '</span>'
-                        
-                        # Chunk headers (@@ -x,y +a,b @@)
-                        elif line.startswith("@@"):
-                            styled_line = '<span style="color: #3498db; background-color: #eef6fc;">' + line + '</span>'
-                            
-                            # Add a horizontal rule after chunk headers
-                            styled_line += '<hr style="border: 0; height: 1px; background-color: #eee; margin: 5px 0;">'
-                            
-                            # Extract section info if available
-                            section_match = line.split("@@")
-                            if len(section_match) > 2:
-                                current_section = section_match[2].strip()
+                    if len(diff_lines) > LARGE_DIFF_LINES:
+                        # A plain text view only lays out the lines on screen, where
+                        # HTML would be laid out in full before the window appears
+                        diff_view = QPlainTextEdit()
+                        diff_view.setReadOnly(True)
+                        diff_view.setUndoRedoEnabled(False)
+                        diff_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+                        diff_view.setFont(code_font)
+                        if len(diff_lines) <= HIGHLIGHT_MAX_LINES:
+                            self.diff_highlighter = DiffSyntaxHighlighter(diff_view.document())
+                        splitter.addWidget(diff_view)
                         
-                        # Added lines
-                        elif line.startswith("+"):
-                            styled_line = '<span style="color: #27ae60; background-color: #e6ffec;">' + line + '</span>'
+                        # Insert the diff a chunk at a time from the event loop, so the
+                        # window shows up at once and repaints while the rest comes in
+                        diff_cursor = QTextCursor(diff_view.document())
                         
-                        # Removed lines
-                        elif line.startswith("-"):
-                            styled_line = '<span style="color: #c0392b; background-color: #ffebe9;">' + line + '</span>'
+                        def insert_chunk(start):
+                            end = min(start + DIFF_CHUNK_LINES, len(diff_lines))
+                            diff_cursor.insertText(("\n" if start else "") + "\n".join(diff_lines[start:end]))
+                            if end < len(diff_lines):
+                                QTimer.singleShot(0, lambda: insert_chunk(end))
                         
-                        # Context lines
-                        else:
-                            styled_line = '<span style="color: #34495e;">' + line + '</span>'
+                        QTimer.singleShot(0, lambda: insert_chunk(0))
                         
-                        processed_diff.append(styled_line)
+                        # Comments can't go inline here, so list them alongside the code
+                        if issues or suggestions:
+                            comments_browser = QTextBrowser()
+                            comments_browser.setOpenExternalLinks(True)
+                            comments_browser.setUndoRedoEnabled(False)
+                            self._set_html(
+                                comments_browser,
+                                '<div class="review">' + self._comments_html(issues, suggestions) + '</div>'
+                            )
+                            splitter.addWidget(comments_browser)
+                            splitter.setStretchFactor(0, 3)
+                            splitter.setStretchFactor(1, 1)
+                        diff_layout.addWidget(splitter)
+                    else:
+                        # Create a single content area with inline comments
+                        diff_browser = QTextBrowser()
+                        diff_browser.setOpenExternalLinks(True)
+                        # Read-only content, so skip undo bookkeeping for the big document
+                        diff_browser.setUndoRedoEnabled(False)
+                        diff_browser.setLineWrapMode(QTextEdit.NoWrap)
+                        diff_browser.setFont(code_font)
+                        diff_browser.setPlainText("Rendering review...")
+                        diff_layout.addWidget(diff_browser)
                         
-                        # Insert comments after file headers
-                        if line.startswith("diff --git") and (issues or suggestions):
-                            # Add inline comment for file
-                            file_comments = []
-                            
-                            if issues:
-                                # Find issues that might be related to this file
-                                file_issues = [issue for issue in issues 
-                                             if file_path and (file_path.lower() in issue.lower() or 
-                                                            any(keyword in issue.lower() for keyword in current_section.lower().split()))]
-                                
-                                # If we found specific issues for this file, add them
-                                if file_issues:
-                                    file_comments.append("""
-                                    <div>
-                                        <h4 style="color: #c0392b; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">Issues:</h4>
-                                        <ul style="color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px;">
-                                    """)
-                                    for issue in file_issues:
-                                        file_comments.append('<li style="margin-bottom: 10px;">' + issue + '</li>')
-                                    file_comments.append('</ul></div>')
-                            
-                            if suggestions:
-                                # Find suggestions that might be related to this file
-                                file_suggestions = [suggestion for suggestion in suggestions 
-                                                  if file_path and (file_path.lower() in suggestion.lower() or 
-                                                                 any(keyword in suggestion.lower() for keyword in current_section.lower().split()))]
-                                
-                                # If we found specific suggestions for this file, add them
-                                if file_suggestions:
-                                    file_comments.append("""
-                                    <div style="margin-top: 15px;">
-                                        <h4 style="color: #2980b9; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">Suggestions:</h4>
-                                        <ul style="color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px;">
-                                    """)
-                                    for suggestion in file_suggestions:
-                                        file_comments.append('<li style="margin-bottom: 10px;">' + suggestion + '</li>')
-                                    file_comments.append('</ul></div>')
-                            
-                            # Only add the comment box if we have relevant comments
-                            if file_comments:
-                                processed_diff.append("</pre>")  # End preformatted text for code
-                                processed_diff.append("""
-                                <div style="border-left: 4px solid #3498db; background-color: #f8f9fa; 
-                                            padding: 15px; margin: 20px 0; border-radius: 0 5px 5px 0;
-                                            font-family: Arial, sans-serif; font-size: 14px; color: #333333;
-                                            box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                                """)
-                                processed_diff.extend(file_comments)
-                                processed_diff.append('</div>')
-                                processed_diff.append("<pre>")  # Resume preformatted text for code
-                        
-                        # Add comments after specific interesting chunks of code
-                        if line.startswith("@@") and (issues or suggestions):
-                            # Identify if any issues or suggestions seem to relate to this chunk
-                            chunk_comments = []
-                            
-                            # Get the next few lines for context
-                            context_lines = []
-                            for j in range(i+1, min(i+6, len(diff_lines))):
-                                if j < len(diff_lines):
-                                    context_lines.append(diff_lines[j])
-                            context_text = ' '.join(context_lines)
-                            
-                            if issues:
-                                # Find issues that might be related to this chunk
-                                chunk_issues = [issue for issue in issues 
-                                              if any(keyword in issue.lower() for keyword in context_text.lower().split())]
-                                
-                                # If we found specific issues for this chunk, add them
-                                if chunk_issues:
-                                    chunk_comments.append("""
-                                    <div>
-                                        <h4 style="color: #c0392b; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">Issues in this section:</h4>
-                                        <ul style="color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px;">
-                                    """)
-                                    for issue in chunk_issues:
-                                        chunk_comments.append('<li style="margin-bottom: 10px;">' + issue + '</li>')
-                                    chunk_comments.append('</ul></div>')
-                            
-                            if suggestions:
-                                # Find suggestions that might be related to this chunk
-                                chunk_suggestions = [suggestion for suggestion in suggestions 
-                                                   if any(keyword in suggestion.lower() for keyword in context_text.lower().split())]
-                                
-                                # If we found specific suggestions for this chunk, add them
-                                if chunk_suggestions:
-                                    chunk_comments.append("""
-                                    <div style="margin-top: 15px;">
-                                        <h4 style="color: #2980b9; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">Suggestions for this section:</h4>
-                                        <ul style="color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px;">
-                                    """)
-                                    for suggestion in chunk_suggestions:
-                                        chunk_comments.append('<li style="margin-bottom: 10px;">' + suggestion + '</li>')
-                                    chunk_comments.append('</ul></div>')
-                            
-                            # Only add the comment box if we have relevant comments
-                            if chunk_comments:
-                                processed_diff.append("</pre>")  # End preformatted text for code
-                                processed_diff.append("""
-                                <div style="border-left: 4px solid #3498db; background-color: #f8f9fa; 
-                                            padding: 15px; margin: 20px 0; border-radius: 0 5px 5px 0;
-                                            font-family: Arial, sans-serif; font-size: 14px; color: #333333;
-                                            box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                                """)
-                                processed_diff.extend(chunk_comments)
-                                processed_diff.append('</div>')
-                                processed_diff.append("<pre>")  # Resume preformatted text for code
-                    
-                    processed_diff.append("</pre>")  # End preformatted text
-                    
-                    # Add remaining general issues/suggestions at the end
-                    if issues or suggestions:
-                        processed_diff.append("""
-                        <div style="background-color: #f8f9fa; border: 1px solid #ddd; padding: 10px; 
-                                    margin-top: 20px; border-radius: 5px;">
-                            <h3 style="color: #2c3e50; margin-top: 0;">Additional Feedback</h3>
-                        """)
-                        
-                        if issues:
-                            processed_diff.append("""
-                            <h4 style="color: #c0392b; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">Issues (""" + str(len(issues)) + """):</h4>
-                            <ul style="color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px;">
-                            """)
-                            for issue in issues:
-                                processed_diff.append('<li style="margin-bottom: 12px;">' + issue + '</li>')
-                            processed_diff.append("</ul>")
-                        
-                        if suggestions:
-                            processed_diff.append("""
-                            <h4 style="color: #2980b9; margin-top: 20px; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">Suggestions (""" + str(len(suggestions)) + """):</h4>
-                            <ul style="color: #333333; margin-top: 10px; list-style-position: outside; padding-left: 20px;">
-                            """)
-                            for suggestion in suggestions:
-                                processed_diff.append('<li style="margin-bottom: 12px;">' + suggestion + '</li>')
-                            processed_diff.append("</ul>")
-                        
-                        processed_diff.append("</div>")
-                    
-                    # Join all the HTML and set it
-                    diff_browser.setHtml('\n'.join(processed_diff))
-                    
-                    # Add to layout
-                    diff_layout.addWidget(diff_browser)
+                        # Build the HTML off the GUI thread and swap it in when it's done;
+                        # keep the builder so its signal outlives the pool thread
+                        self._diff_builder = _HtmlBuilder(lambda: self._diff_html(
+                            diff_lines, review_html, issues, suggestions, review_data.get("by_line", {})
+                        ))
+                        self._diff_builder.setAutoDelete(False)
+                        self._diff_builder.signals.ready.connect(
+                            lambda html_text: self._set_html(diff_browser, html_text)
+                        )
+                        QThreadPool.globalInstance().start(self._diff_builder)
                     
                     tab_widget.addTab(diff_tab, "Code Review")
                 
@@ -368,78 +411,46 @@ try:
                 # Create text browser for HTML formatting
                 review_text_browser = QTextBrowser()
                 review_text_browser.setOpenExternalLinks(True)
+                review_text_browser.setUndoRedoEnabled(False)
                 
-                # Format content with HTML styling
-                review_html = """
-                <div style="font-family: Arial, sans-serif; line-height: 1.6;">
-                    <h2 style="color: #2c3e50; border-bottom: 1px solid #ecf0f1; padding-bottom: 10px;">
-                        Review Summary
-                    </h2>
-                    <div style="color: #34495e; margin-bottom: 20px;">
-                        """ + review_data.get("review_text", "No review available.").replace('\n', '<br>') + """
-                    </div>
-                """
-                
-                # Add issues section if there are issues
-                if review_data.get("issues"):
-                    review_html += """
-                    <h2 style="color: #c0392b; border-bottom: 1px solid #ecf0f1; padding-bottom: 10px; 
-                               margin-top: 30px;">
-                        Issues to Address
-                    </h2>
-                    <ul style="color: #e74c3c;">
-                    """
-                    
-                    for issue in review_data["issues"]:
-                        review_html += '<li style="margin-bottom: 12px;">' + issue + '</li>'
-                    
-                    review_html += "</ul>"
-                
-                # Add suggestions section if there are suggestions
-                if review_data.get("suggestions"):
-                    review_html += """
-                    <h2 style="color: #2980b9; border-bottom: 1px solid #ecf0f1; padding-bottom: 10px; 
-                               margin-top: 30px;">
-                        Suggestions for Improvement
-                    </h2>
-                    <ul style="color: #3498db;">
-                    """
-                    
-                    for suggestion in review_data["suggestions"]:
-                        review_html += '<li style="margin-bottom: 12px;">' + suggestion + '</li>'
-                    
-                    review_html += "</ul>"
+                review_layout.addWidget(review_text_browser)
+                summary_index = tab_widget.addTab(review_tab, "Summary")
                 
-                review_html += "</div>"
+                def populate_summary():
+                    self._set_html(review_text_browser, self._summary_html(review_html, issues, suggestions))
                 
-                review_text_browser.setHtml(review_html)
-                review_layout.addWidget(review_text_browser)
-                tab_widget.addTab(review_tab, "Summary")
+                # Only the first tab is visible at startup, so the others are
+                # filled in the first time they are opened, if ever
+                lazy_tabs = {}
+                if diff_text:
+                    lazy_tabs[summary_index] = populate_summary
+                else:
+                    populate_summary()
                 
                 # Debug tab with raw response for troubleshooting
                 debug_tab = QWidget()
                 debug_layout = QVBoxLayout(debug_tab)
                 debug_text = QTextEdit()
                 debug_text.setReadOnly(True)
+                debug_text.setUndoRedoEnabled(False)
                 
-                # Show all keys and their types, plus review_text contents
-                debug_info = "Review Data Keys:\n"
-                for key in review_data:
-                    debug_info += f"- {key}: {type(review_data[key]).__name__}\n"
-                    
-                debug_info += "\nReview Text Content:\n"
-                debug_info += review_data.get("review_text", "No review text")
-                
-                debug_text.setText(debug_info)
                 debug_layout.addWidget(debug_text)
-                tab_widget.addTab(debug_tab, "Debug")
+                debug_index = tab_widget.addTab(debug_tab, "Debug")
+                lazy_tabs[debug_index] = lambda: debug_text.setText(self._debug_info(review_data, review_text))
+                
+                def populate_tab(index):
+                    populate = lazy_tabs.pop(index, None)
+                    if populate:
+                        populate()
+                
+                tab_widget.currentChanged.connect(populate_tab)
                 
                 # Buttons layout
                 buttons_layout = QHBoxLayout()
                 main_layout.addLayout(buttons_layout)
                 
                 # Warning text for critical issues
-                has_critical = any("critical" in str(issue).lower() for issue in review_data.get("issues", []))
+                has_critical = review_data.get("has_critical", False)
                 if has_critical:
                     warning_label = QLabel("⚠️ Critical issues found! Please fix before pushing.")
                     warning_label.setStyleSheet("color: #e74c3c; font-weight: bold; font-size: 14px;")
@@ -470,9 +481,8 @@ try:
                 
                 # Center window on screen
                 frameGm = self.window.frameGeometry()
-                screen = app.desktop().screenNumber(app.desktop().cursor().pos())
-                centerPoint = app.desktop().screenGeometry(screen).center()
-                frameGm.moveCenter(centerPoint)
+                screen = QGuiApplication.screenAt(QCursor.pos()) or QGuiApplication.primaryScreen()
+                frameGm.moveCenter(screen.geometry().center())
                 self.window.move(frameGm.topLeft())
                 
                 # Run application
@@ -485,6 +495,167 @@ try:
                 QMessageBox.critical(None, "UI Error", f"Error displaying review: {e}")
                 return False
         
+        def _set_html(self, browser: "QTextBrowser", html_text: str) -> None:
+            """Lay out review HTML in a detached document, then hand it to the browser in one step"""
+            # Parsing into the browser's own document would update the widget
+            # as it goes; a fresh document is only attached once it is complete
+            document = QTextDocument(browser)
+            document.setUndoRedoEnabled(False)
+            document.setDefaultFont(browser.font())
+            document.setDefaultStyleSheet(_REVIEW_CSS)
+            document.setHtml(html_text)
+            browser.setDocument(document)
+        
+        def _diff_html(
+            self,
+            diff_lines: List[str],
+            review_html: str,
+            issues: List[str],
+            suggestions: List[str],
+            by_line: Dict[str, List[str]]
+        ) -> str:
+            """Build the HTML for the Code Review tab, with comments inline"""
+            # Process the diff to add inline comments
+            processed_diff = []
+            file_path = ""
+            new_path = ""
+            current_section = ""
+            
+            # Summary header at the top
+            processed_diff.append("""
+            <div class="summary">
+                <h3>Review Summary</h3>
+                <div class="summary-text">""" + review_html + """</div>
+            </div>
+            """)
+            
+            processed_diff.append("<pre>")  # Start preformatted text
+            
+            # Index the comments by keyword once so each file and chunk only
+            # needs a lookup per word rather than a scan of every comment
+            issue_index = _keyword_index(issues)
+            suggestion_index = _keyword_index(suggestions)
+            lower_issues = [issue.lower() for issue in issues]
+            lower_suggestions = [suggestion.lower() for suggestion in suggestions]
+            
+            has_comments = bool(issues or suggestions)
+            
+            for i, line in enumerate(diff_lines):
+                # Colorize diff lines based on content
+                processed_diff.append(_render_line(line))
+                
+                # Only file and chunk headers need anything beyond styling, so
+                # classify each line once by its first character
+                first = line[:1]
+                if first == "d" and line.startswith("diff --git"):
+                    # Extract file path
+                    parts = line.split(" ")
+                    if len(parts) > 2:
+                        file_path = parts[2][2:]  # Remove a/ prefix
+                    # Line references are to the new version of the file
+                    new_path = line.rsplit(" b/", 1)[-1] if " b/" in line else file_path
+                    
+                    # Insert comments after file headers
+                    if has_comments and file_path:
+                        lower_path = file_path.lower()
+                        section_words = _keywords(current_section)
+                        
+                        # Find comments that mention this file or share words with its last section
+                        section_issues = set(_matching_comments(issues, issue_index, section_words))
+                        file_issues = [issue for issue, lower_issue in zip(issues, lower_issues)
+                                     if lower_path in lower_issue or issue in section_issues]
+                        section_suggestions = set(_matching_comments(suggestions, suggestion_index, section_words))
+                        file_suggestions = [suggestion for suggestion, lower_suggestion in zip(suggestions, lower_suggestions)
+                                          if lower_path in lower_suggestion or suggestion in section_suggestions]
+                        
+                        # Only add the comment box if we have relevant comments
+                        if file_issues or file_suggestions:
+                            processed_diff.append(_comment_box(file_issues, "Issues:", file_suggestions, "Suggestions:"))
+                elif first == "@" and line.startswith("@@"):
+                    # Extract section info if available
+                    section_match = line.split("@@")
+                    if len(section_match) > 2:
+                        current_section = section_match[2].strip()
+                    
+                    # Add comments after specific interesting chunks of code
+                    if has_comments:
+                        # Use the next few lines for context
+                        context_words = _keywords(' '.join(diff_lines[i + 1:i + 6]))
+                        
+                        # Identify if any issues or suggestions seem to relate to this chunk,
+                        # either by wording or by naming one of its lines
+                        referenced = _hunk_comments(line, new_path, by_line)
+                        chunk_issues = _matching_comments(issues, issue_index, context_words, referenced)
+                        chunk_suggestions = _matching_comments(suggestions, suggestion_index, context_words, referenced)
+                        
+                        # Only add the comment box if we have relevant comments
+                        if chunk_issues or chunk_suggestions:
+                            processed_diff.append(_comment_box(
+                                chunk_issues, "Issues in this section:",
+                                chunk_suggestions, "Suggestions for this section:"
+                            ))
+            
+            processed_diff.append("</pre>")  # End preformatted text
+            
+            # The full lists of issues and suggestions are on the Summary tab
+            return '\n'.join(processed_diff)
+        
+        def _summary_html(self, review_html: str, issues: List[str], suggestions: List[str]) -> str:
+            """Build the HTML for the Summary tab"""
+            # Format content with HTML styling
+            review_parts = ["""
+            <div class="review">
+                <h2>
+                    Review Summary
+                </h2>
+                <div class="review-text">
+                    """ + review_html + """
+                </div>
+            """]
+            
+            review_parts.append(self._comments_html(issues, suggestions))
+            review_parts.append("</div>")
+            
+            return "".join(review_parts)
+        
+        def _comments_html(self, issues: List[str], suggestions: List[str]) -> str:
+            """Build the HTML listing the issues and suggestions"""
+            comment_parts = []
+            
+            # Add issues section if there are issues
+            if issues:
+                comment_parts.append("""
+                <h2 class="issues">
+                    Issues to Address
+                </h2>
+                <ul class="issues">
+                """)
+                comment_parts.extend(['<li>' + _escape(issue) + '</li>' for issue in issues])
+                comment_parts.append("</ul>")
+            
+            # Add suggestions section if there are suggestions
+            if suggestions:
+                comment_parts.append("""
+                <h2 class="suggestions">
+                    Suggestions for Improvement
+                </h2>
+                <ul class="suggestions">
+                """)
+                comment_parts.extend(['<li>' + _escape(suggestion) + '</li>' for suggestion in suggestions])
+                comment_parts.append("</ul>")
+            
+            return "".join(comment_parts)
+        
+        def _debug_info(self, review_data: Dict[str, Any], review_text: str) -> str:
+            """Build the text for the Debug tab"""
+            # Show all keys and their types, plus review_text contents
+            debug_parts = ["Review Data Keys:\n"]
+            debug_parts.extend([f"- {key}: {type(value).__name__}\n" for key, value in review_data.items()])
+            debug_parts.append("\nReview Text Content:\n")
+            debug_parts.append(review_text)
+            
+            return "".join(debug_parts)
+        
         def _confirm_proceed(self):
             """Show confirmation dialog for critical issues"""
             confirm = QMessageBox.warning(
@@ -505,7 +676,6 @@ try:
         
         def show_error(self, message: str) -> None:
             """Display an error message using QMessageBox"""
-            from claude_pr_reviewer.ui import GUI_TOOLKIT
             if GUI_TOOLKIT != "PyQt5":
                 print(f"Error: {message}")
                 return
@@ -515,32 +685,8 @@ try:
         
         def _fallback_show_review(self, review_data: Dict[str, Any]) -> bool:
             """Terminal-based fallback for systems without PyQt5"""
-            print("\n\n===== CLAUDE PR REVIEW =====")
-            print("\nReview Results:")
-            print(review_data.get("review_text", "No review available."))
-            
-            if review_data.get("issues"):
-                print("\nIssues:")
-                for issue in review_data["issues"]:
-                    print(f"• {issue}")
-            
-            if review_data.get("suggestions"):
-                print("\nSuggestions:")
-                for suggestion in review_data["suggestions"]:
-                    print(f"• {suggestion}")
-            
-            has_critical = any("critical" in str(issue).lower() for issue in review_data.get("issues", []))
-            if has_critical:
-                print("\n⚠️  CRITICAL ISSUES FOUND! Please fix before pushing.")
-                
-            while True:
-                response = input("\nDo you want to proceed with the push? (y/n): ").lower()
-                if response in ('y', 'yes'):
-                    return True
-                elif response in ('n', 'no'):
-                    return False
-                else:
-                    print("Please enter 'y' or 'n'")
+            from claude_pr_reviewer.ui.terminal_ui import TerminalUI
+            return TerminalUI().show_review(review_data)
 except ImportError:
     # Define a dummy class for when PyQt5 is not available
     class PyQtUI:
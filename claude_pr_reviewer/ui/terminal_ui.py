@@ -2,6 +2,7 @@
 Terminal-based UI implementation.
 """
 
+import sys
 from typing import Dict, Any
 from claude_pr_reviewer.interfaces import UserInterfaceInterface
 
@@ -9,25 +10,45 @@ from claude_pr_reviewer.interfaces import UserInterfaceInterface
 class TerminalUI(UserInterfaceInterface):
     """Fallback terminal-based UI implementation"""
     
+    def __init__(self):
+        """Initialize streaming state"""
+        self.streamed = False
+    
+    def show_progress(self, text: str) -> None:
+        """Print the review text as it arrives"""
+        if not self.streamed:
+            print("\n\n===== CLAUDE PR REVIEW =====")
+            print("\nReview Results:")
+            self.streamed = True
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    
     def show_review(self, review_data: Dict[str, Any]) -> bool:
         """Display the review in the terminal and get user confirmation"""
-        print("\n\n===== CLAUDE PR REVIEW =====")
-        print("\nReview Results:")
-        print(review_data.get("review_text", "No review available."))
+        # Build the whole report first and write it in one go
+        parts = []
+        if self.streamed:
+            # The review text has already been printed while streaming
+            parts.append("\n")
+        else:
+            parts.append("\n\n===== CLAUDE PR REVIEW =====\n")
+            parts.append("\nReview Results:\n")
+            parts.append(f"{review_data.get('review_text', 'No review available.')}\n")
         
         if review_data.get("issues"):
-            print("\nIssues:")
-            for issue in review_data["issues"]:
-                print(f"• {issue}")
+            parts.append("\nIssues:\n")
+            parts.extend(f"• {issue}\n" for issue in review_data["issues"])
         
         if review_data.get("suggestions"):
-            print("\nSuggestions:")
-            for suggestion in review_data["suggestions"]:
-                print(f"• {suggestion}")
+            parts.append("\nSuggestions:\n")
+            parts.extend(f"• {suggestion}\n" for suggestion in review_data["suggestions"])
         
-        has_critical = any("critical" in str(issue).lower() for issue in review_data.get("issues", []))
+        has_critical = review_data.get("has_critical", False)
         if has_critical:
-            print("\n⚠️  CRITICAL ISSUES FOUND! Please fix before pushing.")
+            parts.append("\n⚠️  CRITICAL ISSUES FOUND! Please fix before pushing.\n")
+        
+        sys.stdout.write("".join(parts))
+        sys.stdout.flush()
             
         while True:
             response = input("\nDo you want to proceed with the push? (y/n): ").lower()
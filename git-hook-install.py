@@ -7,9 +7,10 @@ This script installs the pre-push hook in the current git repository.
 import os
 import sys
 import stat
+import errno
 import shutil
 import subprocess
-from pathlib import Path
+import importlib.util
 
 
 def get_git_root() -> str:
@@ -24,27 +25,49 @@ def get_git_root() -> str:
         sys.exit(1)
 
 
+def copy_file(src: str, dst: str) -> str:
+    """Copy a file with its metadata, letting the kernel share blocks on filesystems that support it"""
+    # copy_file_range (Linux) can reflink on btrfs/XFS and copies in-kernel elsewhere
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+            shutil.copystat(src, dst)
+            return dst
+        except OSError as e:
+            # Old kernels, copies across filesystems and some filesystems don't support it
+            if e.errno not in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    return shutil.copy2(src, dst)
+
+
 def create_hook_file(hooks_dir: str, script_path: str) -> None:
     """Create the pre-push hook file"""
     hook_path = os.path.join(hooks_dir, "pre-push")
     
-    # Create the hook file content
-    hook_content = f"""#!/bin/sh
+    # Create the hook file content; it runs the reviewer in its own Python
+    # process rather than starting a shell just to start Python
+    hook_content = f"""#!/usr/bin/env python3
 # Claude PR Reviewer pre-push hook
 # This hook runs the Claude PR Reviewer before pushing commits
-
-# Get the directory where the script is located
-SCRIPT_DIR="$(dirname "$0")"
+import os
+import sys
+import runpy
 
 # Add the hooks directory to Python path to find the claude_pr_reviewer package
-PYTHONPATH="$SCRIPT_DIR:$PYTHONPATH" python3 "{script_path}" "$@"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.argv[0] = {script_path!r}
 
-# Check the exit code
-exit_code=$?
-if [ $exit_code -ne 0 ]; then
-    echo "Push cancelled by Claude PR Reviewer."
-    exit $exit_code
-fi
+try:
+    runpy.run_path({script_path!r}, run_name="__main__")
+except SystemExit as e:
+    if e.code not in (None, 0):
+        print("Push cancelled by Claude PR Reviewer.")
+    raise
+except BaseException:
+    print("Push cancelled by Claude PR Reviewer.")
+    raise
 """
     
     # Write the hook file
@@ -59,27 +82,32 @@ fi
 
 def install_dependencies() -> None:
     """Install required Python dependencies"""
-    try:
-        print("Installing required Python dependencies...")
-        # First install required packages
-        subprocess.check_call([
-            sys.executable, "-m", "pip", "install", "requests"
-        ])
-        
-        # Try to install PyQt5, but don't fail if it can't be installed
-        try:
-            print("Attempting to install PyQt5 for GUI...")
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", "PyQt5"
-            ])
+    # Only run pip for packages that can't be imported yet
+    missing = [name for name in ("requests", "PyQt5") if importlib.util.find_spec(name) is None]
+    if not missing:
+        print("Dependencies already installed")
+        return
+    
+    print("Installing required Python dependencies...")
+    pip = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-input"]
+    
+    # Install everything in one pip run so it starts and resolves only once
+    if subprocess.run(pip + missing).returncode == 0:
+        if "PyQt5" in missing:
             print("PyQt5 installed successfully")
-        except subprocess.CalledProcessError:
-            print("Note: PyQt5 could not be installed. Will use terminal UI instead.")
-            
         print("Dependencies installed successfully")
-    except subprocess.CalledProcessError:
-        print("Error: Failed to install core dependencies")
-        sys.exit(1)
+        return
+    
+    # PyQt5 is optional, so retry with just the required packages
+    if "PyQt5" in missing:
+        print("Note: PyQt5 could not be installed. Will use terminal UI instead.")
+        missing.remove("PyQt5")
+        if not missing or subprocess.run(pip + missing).returncode == 0:
+            print("Dependencies installed successfully")
+            return
+    
+    print("Error: Failed to install core dependencies")
+    sys.exit(1)
 
 
 def main() -> None:
@@ -101,36 +129,26 @@ def main() -> None:
     destination_script = os.path.join(git_root, ".git", "hooks", "claude_pr_reviewer.py")
     
     if os.path.exists(os.path.join(script_dir, "claude_pr_reviewer.py")):
-        # Copy the main script
-        shutil.copy2(reviewer_script, destination_script)
-        os.chmod(destination_script, os.stat(destination_script).st_mode | stat.S_IXUSR)
+        # Copy the main script under a temporary name and move it into place,
+        # so a push running meanwhile never sees a half-written script
+        temp_script = destination_script + ".tmp"
+        copy_file(reviewer_script, temp_script)
+        os.chmod(temp_script, os.stat(temp_script).st_mode | stat.S_IXUSR)
+        os.replace(temp_script, destination_script)
         
         # Also copy the claude_pr_reviewer package directory
         package_source = os.path.join(script_dir, "claude_pr_reviewer")
         package_dest = os.path.join(git_root, ".git", "hooks", "claude_pr_reviewer")
         
-        # Create the package directory if it doesn't exist
-        if not os.path.exists(package_dest):
-            os.makedirs(package_dest)
-        
-        # Copy all files from the package
+        # Copy the whole package in one go
         if os.path.isdir(package_source):
-            for item in os.listdir(package_source):
-                item_src = os.path.join(package_source, item)
-                item_dst = os.path.join(package_dest, item)
-                
-                if os.path.isdir(item_src):
-                    # It's a subdirectory, copy it recursively
-                    if not os.path.exists(item_dst):
-                        os.makedirs(item_dst)
-                    for subitem in os.listdir(item_src):
-                        subitem_src = os.path.join(item_src, subitem)
-                        subitem_dst = os.path.join(item_dst, subitem)
-                        if os.path.isfile(subitem_src):
-                            shutil.copy2(subitem_src, subitem_dst)
-                elif os.path.isfile(item_src):
-                    # It's a file, just copy it
-                    shutil.copy2(item_src, item_dst)
+            shutil.copytree(
+                package_source,
+                package_dest,
+                ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+                copy_function=copy_file,
+                dirs_exist_ok=True
+            )
     else:
         print("Error: claude_pr_reviewer.py not found in the same directory as this script")
         sys.exit(1)